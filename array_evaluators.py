@@ -0,0 +1,128 @@
+from typing import Callable, Optional
+
+import numpy as np
+
+from supply_ledger import EXPECTED, ACTUAL
+from supplier import Supplier
+from product import Product
+from period import Period
+from pair import Pair
+
+
+def pack_quantities(
+        suppliers: list[Supplier],
+        products: list[Product],
+        period: Period,
+        out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Pack supplies of all suppliers into a dense tensor
+    of shape (supplier, month, product, {expected, actual}).
+    Missing months and products are treated as zeros,
+    suppliers themselves are left intact.
+
+    :param out: array of floats of the same shape to pack into, e.g. the one backed by shared memory
+    """
+    quantities = out if out is not None else np.zeros(get_quantities_shape(suppliers, products, period))
+    for supplier_index, supplier in enumerate(suppliers):
+        quantities[supplier_index] = supplier.supplies.get_quantities(products, period.length)
+    return quantities
+
+
+def pack_prices(suppliers: list[Supplier], products: list[Product], out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Pack prices of all suppliers into a dense tensor
+    of shape (supplier, product, {expected, actual}).
+    Missing products are treated as zeros.
+
+    :param out: array of floats of the same shape to pack into, e.g. the one backed by shared memory
+    """
+    prices = out if out is not None else np.zeros(get_prices_shape(suppliers, products))
+    for supplier_index, supplier in enumerate(suppliers):
+        prices[supplier_index] = np.reshape([_unpack(supplier.prices, product) for product in products],
+                                            (len(products), 2))
+    return prices
+
+
+def get_quantities_shape(suppliers: list[Supplier], products: list[Product], period: Period) -> tuple[int, ...]:
+    return len(suppliers), period.length, len(products), 2
+
+
+def get_prices_shape(suppliers: list[Supplier], products: list[Product]) -> tuple[int, ...]:
+    return len(suppliers), len(products), 2
+
+
+def _unpack(pairs: dict[str, Pair], product: Product) -> tuple[float, float]:
+    pair = pairs.get(product.name)
+    return (pair.expected, pair.actual) if pair is not None else (0.0, 0.0)
+
+
+def _divide(nominator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """
+    Divide just like scalar evaluators do: zero denominators raise, while nan ones yield nan.
+    """
+    if np.any(denominator == 0.0):
+        raise ZeroDivisionError("float division by zero")
+    return nominator / denominator
+
+
+def _calculate_criterion1(quantities: np.ndarray, prices: np.ndarray) -> np.ndarray:
+    aggregated_quantities = quantities.sum(axis=1)  # supplier x product x {Q(exp), Q(act)}
+    actual_prices = prices[..., ACTUAL]
+    denominator = (actual_prices * aggregated_quantities[..., EXPECTED]).sum(axis=-1)
+    nominator = (actual_prices * aggregated_quantities[..., ACTUAL]).sum(axis=-1)
+    return np.abs(1 - _divide(nominator, denominator))
+
+
+def _calculate_criterion2(quantities: np.ndarray, prices: np.ndarray) -> np.ndarray:
+    aggregated_actual_quantities = quantities[..., ACTUAL].sum(axis=1)  # supplier x product
+    denominator = (prices[..., EXPECTED] * aggregated_actual_quantities).sum(axis=-1)
+    nominator = (prices[..., ACTUAL] * aggregated_actual_quantities).sum(axis=-1)
+    return _divide(nominator, denominator)
+
+
+def _calculate_criterion3(quantities: np.ndarray, prices: np.ndarray) -> np.ndarray:
+    expected = quantities[..., EXPECTED]
+    actual = quantities[..., ACTUAL]
+    nominator = np.abs(actual - expected).sum(axis=(1, 2))
+    denominator = expected.sum(axis=(1, 2))
+    return _divide(nominator, denominator)
+
+
+def _calculate_criterion4(quantities: np.ndarray, prices: np.ndarray) -> np.ndarray:
+    expected = quantities[..., EXPECTED]
+    actual = quantities[..., ACTUAL]
+    return np.abs(1.0 - _divide(actual, expected)).sum(axis=(1, 2))
+
+
+# Array counterparts of the built-in criteria of `evaluators`.
+# Criteria registered with `evaluators.register_evaluator` have none, so they can't be scored here
+_EVALUATORS: dict[str, Callable[[np.ndarray, np.ndarray], np.ndarray]] = {
+    "Объем": _calculate_criterion1,
+    "Цена": _calculate_criterion2,
+    "Ассортимент": _calculate_criterion3,
+    "Ритмичность": _calculate_criterion4,
+}
+
+CRITERION_NAMES = frozenset(_EVALUATORS.keys())
+
+
+def evaluate_packed(quantities: np.ndarray, prices: np.ndarray, criterion_names: list[str]) -> dict[str, np.ndarray]:
+    """
+    Score already packed suppliers.
+    Just like `evaluators.evaluate`, division by zero raises rather than yields either inf or nan,
+    while nan quantities or prices yield nan scores.
+
+    :param criterion_names: names of criteria to be scored, each of them must be in `CRITERION_NAMES`
+    :return: Criterion.name -> scores of all the suppliers
+    :raise RuntimeError: if some of the criteria have no array counterparts
+    :raise ZeroDivisionError: if some of the scores divide by zero
+    """
+    unknown_names = [criterion_name for criterion_name in criterion_names if criterion_name not in _EVALUATORS]
+    if len(unknown_names) > 0:
+        raise RuntimeError(f"No array evaluators for criteria: {', '.join(unknown_names)}")
+    scores = {}
+    with np.errstate(invalid="ignore"):  # Infinite quantities or prices yield nan like scalar evaluators do
+        for criterion_name in criterion_names:
+            scores[criterion_name] = _EVALUATORS[criterion_name](quantities, prices)
+    return scores
@@ -0,0 +1,225 @@
+from typing import Iterable, Optional
+import numpy as np
+import pandas as pd
+
+import dataframe_utils as du
+import skyline
+import ranking
+
+from identity import next_id, next_ids
+from version import next_version
+from contractor import Contractor
+from criterion import Criterion
+
+
+class ContractorTable:
+    """
+    Columnar storage of contractors.
+    Names are kept in a single list, while scores are kept in a single matrix
+    of shape (contractor, criterion) with a column per criterion name.
+    Each contractor also has an identity, which stays the same while the table is edited.
+    """
+
+    MIN_SCORE = 0
+    MAX_SCORE = 5
+
+    __slots__ = ("_criterion_names", "_column_indices", "names", "_scores", "_ids", "_version")
+
+    def __init__(
+            self,
+            criterion_names: Optional[list[str]] = None,
+            names: Optional[list[str]] = None,
+            scores: Optional[np.ndarray] = None
+    ):
+        self._criterion_names = criterion_names if criterion_names is not None else []
+        self._column_indices = {name: index for index, name in enumerate(self._criterion_names)}
+        self.names = names if names is not None else []
+        if scores is None:
+            scores = np.zeros((len(self.names), len(self._criterion_names)), dtype=np.uint8)
+        self._scores = scores
+        identities = next_ids(len(self.names))
+        self._ids = np.arange(identities.start, identities.stop, dtype=np.int64)
+        self._version = next_version()
+
+    def __deepcopy__(self, memo: dict) -> "ContractorTable":
+        # A copy is another model, so it gets a version of its own
+        table = ContractorTable(list(self._criterion_names), list(self.names), self._scores.copy())
+        memo[id(self)] = table
+        return table
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def criterion_names(self) -> list[str]:
+        return self._criterion_names
+
+    @property
+    def ids(self) -> np.ndarray:
+        """
+        :return: identity of each contractor, unlike its index it doesn't change when preceding ones are removed
+        """
+        return self._ids
+
+    @property
+    def version(self) -> int:
+        """
+        Changes whenever either names, scores or criteria do.
+        Names must be modified with `set_name` to be tracked.
+        """
+        return self._version
+
+    def set_name(self, index: int, name: str):
+        if self.names[index] != name:
+            self.names[index] = name
+            self._version = next_version()
+
+    def get_score(self, index: int, criterion_name: str) -> int:
+        column_index = self._column_indices.get(criterion_name)
+        return int(self._scores[index, column_index]) if column_index is not None else 0
+
+    def set_score(self, index: int, criterion_name: str, score: int):
+        column_index = self._column_indices.get(criterion_name)
+        if column_index is None:
+            column_index = self._add_column(criterion_name)
+        self._scores[index, column_index] = score
+        self._version = next_version()
+
+    def append(self, name: str = ""):
+        self.names.append(name)
+        self._scores = np.vstack([self._scores, np.zeros((1, len(self._criterion_names)), dtype=np.uint8)])
+        self._ids = np.append(self._ids, next_id())
+        self._version = next_version()
+
+    def remove(self, index: int):
+        self.names.pop(index)
+        self._scores = np.delete(self._scores, index, axis=0)
+        self._ids = np.delete(self._ids, index)
+        self._version = next_version()
+
+    def assign(self, other: "ContractorTable"):
+        """
+        Replace contents of this table with the ones of another table in-place.
+        """
+        self._criterion_names = other._criterion_names
+        self._column_indices = other._column_indices
+        self.names = other.names
+        self._scores = other._scores
+        self._ids = other._ids
+        self._version = next_version()
+
+    def align(self, criteria: list[Criterion]):
+        """
+        Reorder columns, so the leading ones match the criteria.
+        Columns of missing criteria are kept after them, so their scores are not lost.
+        After that, scores of the criteria can be accessed without copying.
+        """
+        criterion_names = [criterion.name for criterion in criteria]
+        if self._criterion_names[:len(criterion_names)] == criterion_names:
+            return
+        for criterion_name in criterion_names:
+            if criterion_name not in self._column_indices:
+                self._add_column(criterion_name)
+        active_names = set(criterion_names)
+        extra_names = [name for name in self._criterion_names if name not in active_names]
+        new_names = criterion_names + extra_names
+        self._scores = self._scores[:, [self._column_indices[name] for name in new_names]]
+        self._criterion_names = new_names
+        self._column_indices = {name: index for index, name in enumerate(new_names)}
+        self._version = next_version()
+
+    def get_scores(self, criteria: list[Criterion]) -> np.ndarray:
+        """
+        :return: matrix of shape (contractor, criterion). It's a view of the table if it's aligned with the criteria
+        """
+        criterion_names = [criterion.name for criterion in criteria]
+        if self._criterion_names[:len(criterion_names)] == criterion_names:
+            return self._scores[:, :len(criterion_names)]
+        scores = np.zeros((len(self.names), len(criterion_names)), dtype=np.uint8)
+        for index, criterion_name in enumerate(criterion_names):
+            column_index = self._column_indices.get(criterion_name)
+            if column_index is not None:
+                scores[:, index] = self._scores[:, column_index]
+        return scores
+
+    def calculate_total_scores(self, criteria: list[Criterion]) -> np.ndarray:
+        weights = np.array([criterion.value for criterion in criteria], dtype=float)
+        return self.get_scores(criteria) @ weights
+
+    def rank(self, criteria: list[Criterion], count: int, candidates: Optional[np.ndarray] = None) -> list[list[int]]:
+        """
+        :param candidates: indices of contractors to be ranked, all of them by default
+        :return: groups of indices of contractors with close total scores, sorted by score descending
+        """
+        if candidates is None:
+            return ranking.rank(self.calculate_total_scores(criteria), count)
+        weights = np.array([criterion.value for criterion in criteria], dtype=float)
+        total_scores = self.get_scores(criteria)[candidates] @ weights
+        return [[int(candidates[index]) for index in group] for group in ranking.rank(total_scores, count)]
+
+    def find_best(self, criteria: list[Criterion], candidates: Optional[np.ndarray] = None) -> list[int]:
+        """
+        :param candidates: indices of contractors to choose from.
+                           The Pareto front gives the same result for strictly positive weights
+        """
+        groups = self.rank(criteria, count=1, candidates=candidates)
+        return groups[0] if len(groups) > 0 else []
+
+    def find_pareto_front(self, criteria: list[Criterion]) -> np.ndarray:
+        """
+        :return: indices of contractors which are not dominated by any other one
+        """
+        return skyline.find_skyline(self.get_scores(criteria))
+
+    def to_dataframe(self, criteria: list[Criterion]) -> pd.DataFrame:
+        """
+        Build the same dataframe as `Contractor.to_dataframe` does.
+        Scores are not copied if the table is aligned with the criteria.
+        """
+        scores = self.get_scores(criteria)
+        dataframe = pd.DataFrame(scores, columns=[criterion.name for criterion in criteria], copy=False)
+        dataframe.insert(0, Contractor.NAME_TEXT, self.names)
+        return dataframe
+
+    @staticmethod
+    def from_dataframe(criteria: list[Criterion], dataframe: pd.DataFrame) -> "ContractorTable":
+        return ContractorTable.from_dataframes(criteria, [dataframe])
+
+    @staticmethod
+    def from_dataframes(criteria: list[Criterion], dataframes: Iterable[pd.DataFrame]) -> "ContractorTable":
+        """
+        Load contractors from consecutive chunks of rows.
+        Each chunk is validated and converted into compact scores right away,
+        so it can be released before the next one.
+        """
+        criterion_names = [criterion.name for criterion in criteria]
+        names = []
+        chunks = [np.zeros((0, len(criterion_names)), dtype=np.uint8)]
+        for dataframe in dataframes:
+            du.check_columns(dataframe, [Contractor.NAME_TEXT, *criterion_names])
+            scores = du.to_floats(dataframe[criterion_names])
+            is_valid = (scores >= ContractorTable.MIN_SCORE) & (scores <= ContractorTable.MAX_SCORE) \
+                & (scores == np.round(scores))
+            if not np.all(is_valid):
+                raise RuntimeError(f"Баллы подрядчиков должны быть целыми числами "
+                                   f"от {ContractorTable.MIN_SCORE} до {ContractorTable.MAX_SCORE}")
+            # Names are strings just like the ones of suppliers, even if they look like numbers or are missing
+            names.extend(dataframe[Contractor.NAME_TEXT].fillna("").astype(str).tolist())
+            chunks.append(scores.astype(np.uint8))
+        scores = chunks[-1] if len(chunks) == 2 else np.concatenate(chunks)
+        return ContractorTable(criterion_names, names, np.ascontiguousarray(scores))
+
+    @staticmethod
+    def from_contractors(criteria: list[Criterion], contractors: list[Contractor]) -> "ContractorTable":
+        criterion_names = [criterion.name for criterion in criteria]
+        names = [contractor.name for contractor in contractors]
+        scores = Contractor.to_score_matrix(criteria, contractors).astype(np.uint8)
+        return ContractorTable(criterion_names, names, scores)
+
+    def _add_column(self, criterion_name: str) -> int:
+        column_index = len(self._criterion_names)
+        self._criterion_names = self._criterion_names + [criterion_name]
+        self._column_indices[criterion_name] = column_index
+        self._scores = np.hstack([self._scores, np.zeros((len(self.names), 1), dtype=np.uint8)])
+        self._version = next_version()
+        return column_index
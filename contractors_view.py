@@ -1,7 +1,12 @@
+from io import BytesIO
 import streamlit as st
-import pandas as pd
 
-from dataframe_utils import convert_to_csv
+import dataframe_utils as du
+import parse_cache
+
+from contractor_table import ContractorTable
+from download_view import DownloadView
+from paging_view import PagingView
 from contractor import Contractor
 from criterion import Criterion
 from problems import Problems
@@ -10,21 +15,40 @@ from key import Key
 
 
 class ContractorsView:
+    _TOTAL_SCORES_KEY = Key("contractors.total_scores", default_value=None)  # (version, total scores)
+    _VALIDATION_KEY = Key("contractors.validation", default_value=None)  # (version, problems)
+    _SWEPT_KEY = Key("contractors.swept", default_value=None)  # (hash of identities, names of criteria)
+
     @staticmethod
-    def create(has_errors: bool, criteria: list[Criterion], contractors: list[Contractor]) -> Problems:
+    def create(has_errors: bool, criteria: list[Criterion], contractors: ContractorTable) -> Problems:
+        """
+        Only contractors on the current page get widgets, while total scores and validation cover all of them.
+        """
         st.header("Подрядчики")
         problems = Problems()
         if has_errors or len(criteria) == 0:
             problems.add_error("Невозможно отобразить данные о подрядчиках, пока не заданы корректные критерии")
             return problems
         contractors_file_changed_key = Key("contractors.file.changed", default_value=False)
-        csv_file = st.file_uploader("Загрузить подрядчиков", type="csv",
-                                    on_change=lambda: State.set(contractors_file_changed_key))
-        if State.reset(contractors_file_changed_key) and csv_file is not None:
-            dataframe = pd.read_csv(csv_file)
-            uploaded_contractors = Contractor.from_dataframe(criteria, dataframe)
-            contractors.clear()
-            contractors.extend(uploaded_contractors)
+        contractors_file = st.file_uploader("Загрузить подрядчиков", type=["csv", "parquet", "arrow"],
+                                            on_change=lambda: State.set(contractors_file_changed_key))
+        if State.reset(contractors_file_changed_key) and contractors_file is not None:
+            try:
+                columns = [Contractor.NAME_TEXT, *[criterion.name for criterion in criteria]]
+                uploaded_contractors = parse_cache.get_or_parse(
+                    contractors_file, ("contractors", *columns),
+                    lambda: ContractorsView._parse_contractors(contractors_file, criteria, columns))
+                contractors.assign(uploaded_contractors)
+            except RuntimeError as error:
+                problems.add_error(str(error))
+        contractors.align(criteria)
+        criterion_names = tuple(criterion.name for criterion in criteria)
+        if State.change(ContractorsView._SWEPT_KEY, (hash(contractors.ids.tobytes()), criterion_names)):
+            ContractorsView._sweep(criteria, contractors)
+        criteria_version = Criterion.get_version(criteria)
+        total_scores = State.memoize(ContractorsView._TOTAL_SCORES_KEY, (contractors.version, criteria_version),
+                                     lambda: contractors.calculate_total_scores(criteria))
+        page_indices = PagingView.create(contractors.names, lambda: total_scores, view_key="contractors")
         column_width_weights = [1, 14, 33, 3, 1]
         with st.container():
             columns = st.columns(column_width_weights)
@@ -37,63 +61,106 @@ class ContractorsView:
                         st.text(criterion.name)
             with columns[-2]:
                 st.text("Балл", help="Суммарная оценка подрядчика с учетом всех критериев")
-        for contractor_index, contractor in enumerate(contractors):
+        for contractor_index in page_indices:
+            contractor_id = int(contractors.ids[contractor_index])
             with st.container():
                 columns = st.columns(column_width_weights)
                 with columns[0]:
                     st.text(f"{contractor_index + 1}.")
                 with columns[1]:
-                    contractor.name = st.text_input(Contractor.NAME_TEXT, key=f"contractor_name_{contractor_index}",
-                                                    value=contractor.name, label_visibility="collapsed").strip()
+                    name_key = f"contractor_name_{contractor_id}"
+
+                    def save_name(i: int = contractor_index, widget_key: str = name_key):
+                        contractors.set_name(i, st.session_state[widget_key].strip())
+
+                    State.sync(name_key, contractors.names[contractor_index])
+                    st.text_input(Contractor.NAME_TEXT, key=name_key, label_visibility="collapsed",
+                                  on_change=save_name)
                 with columns[2]:
                     criterion_columns = st.columns(len(criteria))
                     for criterion_index, criterion in enumerate(criteria):
                         with criterion_columns[criterion_index]:
-                            ContractorsView._create_contractor_score_input(criterion, contractor)
+                            ContractorsView._create_contractor_score_input(criterion, contractors, contractor_index,
+                                                                          contractor_id)
                 with columns[-2]:
-                    st.text(f"{contractor.calculate_total_score(criteria):.2f}")
+                    st.text(f"{total_scores[contractor_index]:.2f}")
                 with columns[-1]:
                     def remove_contractor(i: int = contractor_index):
-                        contractors.pop(i)
+                        contractors.remove(i)
 
-                    st.button(":x:", key=f"contractor_remove_{contractor_index}", help="Удалить подрядчика",
+                    st.button(":x:", key=f"contractor_remove_{contractor_id}", help="Удалить подрядчика",
                               on_click=remove_contractor)
         st.button(":heavy_plus_sign:", key="contractor_add", help="Добавить подрядчика",
-                  on_click=lambda: contractors.append(Contractor()))
-        ContractorsView._validate_contractors(problems, criteria, contractors)
+                  on_click=lambda: contractors.append())
+        problems.extend(State.memoize(ContractorsView._VALIDATION_KEY, (contractors.version, criteria_version),
+                                      lambda: ContractorsView._validate_contractors(criteria, contractors)))
         if not problems.has_errors:
-            serialized_contractors = convert_to_csv(Contractor.to_dataframe(criteria, contractors))
-            st.download_button("Скачать подрядчиков", serialized_contractors,
-                               file_name=Contractor.FILE_NAME,
-                               mime="text/csv")
+            version = (contractors.version, tuple(criterion.name for criterion in criteria))
+            DownloadView.create("Скачать подрядчиков", lambda: du.convert_to_csv(contractors.to_dataframe(criteria)),
+                                version, file_name=Contractor.FILE_NAME, mime="text/csv", key="contractors_download")
+            DownloadView.create("Скачать подрядчиков (Parquet)",
+                                lambda: du.convert_to_parquet(contractors.to_dataframe(criteria)), version,
+                                file_name=Contractor.PARQUET_FILE_NAME, mime="application/vnd.apache.parquet",
+                                key="contractors_download_parquet")
+            DownloadView.create("Скачать подрядчиков (Arrow)",
+                                lambda: du.convert_to_arrow(contractors.to_dataframe(criteria)), version,
+                                file_name=Contractor.ARROW_FILE_NAME, mime="application/vnd.apache.arrow.file",
+                                key="contractors_download_arrow")
         return problems
 
     @staticmethod
-    def _create_contractor_score_input(criterion: Criterion, contractor: Contractor):
+    def _parse_contractors(contractors_file: BytesIO, criteria: list[Criterion], columns: list[str]) -> ContractorTable:
+        with du.show_progress("Загрузка подрядчиков") as on_progress:
+            dataframes = du.read_chunks(contractors_file, on_progress=on_progress, columns=columns)
+            return ContractorTable.from_dataframes(criteria, dataframes)
+
+    @staticmethod
+    def _create_contractor_score_input(
+            criterion: Criterion,
+            contractors: ContractorTable,
+            index: int,
+            contractor_id: int
+    ):
         def save_score(widget_key: str):
-            contractor.scores[criterion.name] = st.session_state[widget_key]
+            contractors.set_score(index, criterion.name, st.session_state[widget_key])
 
-        key = State.generate_key()
-        old_score = contractor.scores.get(criterion.name, 0)
-        st.number_input(criterion.name, value=old_score, label_visibility="collapsed", key=key,
-                        min_value=0, max_value=5, on_change=lambda: save_score(key))
+        key = f"contractor_score_{contractor_id}_{criterion.name}"
+        State.sync(key, contractors.get_score(index, criterion.name))
+        st.number_input(criterion.name, label_visibility="collapsed", key=key,
+                        min_value=ContractorTable.MIN_SCORE, max_value=ContractorTable.MAX_SCORE,
+                        on_change=lambda: save_score(key))
 
     @staticmethod
-    def _validate_contractors(problems: Problems, criteria: list[Criterion], contractors: list[Contractor]):
+    def _sweep(criteria: list[Criterion], contractors: ContractorTable):
+        """
+        Drop the session state of the contractors and the criteria which have been removed.
+        """
+        contractor_ids = set(contractors.ids.tolist())
+        State.sweep(r"^contractor_[a-z]+_(\d+)", lambda contractor_id: int(contractor_id) in contractor_ids)
+        criterion_names = {criterion.name for criterion in criteria}
+        State.sweep(r"^contractor_score_\d+_(.*)$", lambda criterion_name: criterion_name in criterion_names)
+
+    @staticmethod
+    def _validate_contractors(criteria: list[Criterion], contractors: ContractorTable) -> Problems:
+        problems = Problems()
         duplicates = set()
         names = set()
         if len(contractors) == 0:
             problems.add_error("Не задано ни одного подрядчика")
-            return
-        for index, contractor in enumerate(contractors):
-            if contractor.name == "":
+            return problems
+        has_zero_scores = contractors.get_scores(criteria) == 0
+        rows_with_zero_scores = set(has_zero_scores.any(axis=1).nonzero()[0].tolist())
+        for index, name in enumerate(contractors.names):
+            if name == "":
                 problems.add_error(f"Не задано название подрядчика №{index + 1}")
-            elif contractor.name in names:
-                if contractor.name not in duplicates:
-                    problems.add_error(f"Несколько подрядчиков с одним и тем же названием: {contractor.name}")
-                    duplicates.add(contractor.name)
+            elif name in names:
+                if name not in duplicates:
+                    problems.add_error(f"Несколько подрядчиков с одним и тем же названием: {name}")
+                    duplicates.add(name)
             else:
-                names.add(contractor.name)
-                for criterion in criteria:
-                    if contractor.scores.get(criterion.name, 0) == 0:
-                        problems.add_warning(f"{contractor.name}: не задан балл для критерия '{criterion.name}'")
+                names.add(name)
+                if index in rows_with_zero_scores:
+                    for criterion_index, criterion in enumerate(criteria):
+                        if has_zero_scores[index, criterion_index]:
+                            problems.add_warning(f"{name}: не задан балл для критерия '{criterion.name}'")
+        return problems
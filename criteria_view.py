@@ -1,8 +1,11 @@
 import streamlit as st
-import pandas as pd
 import math
+import re
 
-from dataframe_utils import convert_to_csv
+import dataframe_utils as du
+import parse_cache
+
+from download_view import DownloadView
 from criterion import Criterion
 from problems import Problems
 from state import State
@@ -19,15 +22,26 @@ class CriteriaView:
             disable_add_remove: bool = False
     ) -> Problems:
         st.header("Критерии")
+        problems = Problems()
         if not disable_upload:
             criteria_file_changed_key = Key(f"{view_key}.criteria.file.changed", default_value=False)
-            csv_file = st.file_uploader("Загрузить критерии", key=f"criteria_upload_{view_key}", type="csv",
-                                        on_change=lambda: State.set(criteria_file_changed_key))
-            if State.reset(criteria_file_changed_key) and csv_file is not None:
-                dataframe = pd.read_csv(csv_file)
-                uploaded_criteria = Criterion.from_dataframe(dataframe)
-                criteria.clear()
-                criteria.extend(uploaded_criteria)
+            criteria_file = st.file_uploader("Загрузить критерии", key=f"criteria_upload_{view_key}",
+                                             type=["csv", "parquet", "arrow"],
+                                             on_change=lambda: State.set(criteria_file_changed_key))
+            if State.reset(criteria_file_changed_key) and criteria_file is not None:
+                try:
+                    columns = [Criterion.NAME_TEXT, Criterion.VALUE_TEXT]
+                    uploaded_criteria = parse_cache.get_or_parse(
+                        criteria_file, ("criteria", *columns),
+                        lambda: Criterion.from_dataframes(du.read_chunks(criteria_file, columns=columns)))
+                    criteria.clear()
+                    criteria.extend(uploaded_criteria)
+                except RuntimeError as error:
+                    problems.add_error(str(error))
+        criterion_ids = tuple(criterion.id for criterion in criteria)
+        if State.change(Key(f"{view_key}.criteria.swept", default_value=None), criterion_ids):
+            State.sweep(rf"^criterion_[a-z]+_(\d+)_{re.escape(view_key)}$",
+                        lambda criterion_id: int(criterion_id) in criterion_ids)
         column_width_weights = [1, 30, 20]
         if not disable_add_remove:
             column_width_weights.append(1)
@@ -43,36 +57,50 @@ class CriteriaView:
                 with columns[0]:
                     st.text(f"{index + 1}.")
                 with columns[1]:
-                    criterion.name = st.text_input(Criterion.NAME_TEXT, key=f"criterion_name_{index}_{view_key}",
-                                                   value=criterion.name, disabled=disable_name,
-                                                   label_visibility="collapsed").strip()
+                    name_key = f"criterion_name_{criterion.id}_{view_key}"
+
+                    def save_name(c: Criterion = criterion, widget_key: str = name_key):
+                        c.name = st.session_state[widget_key].strip()
+
+                    State.sync(name_key, criterion.name)
+                    st.text_input(Criterion.NAME_TEXT, key=name_key, disabled=disable_name,
+                                  label_visibility="collapsed", on_change=save_name)
                 with columns[2]:
-                    CriteriaView._create_criterion_value_input(criterion)
+                    CriteriaView._create_criterion_value_input(criterion,
+                                                               key=f"criterion_value_{criterion.id}_{view_key}")
                 if not disable_add_remove:
                     with columns[3]:
                         def remove_criterion(i: int = index):
                             criteria.pop(i)
 
-                        st.button(":x:", key=f"criterion_remove_{index}_{view_key}", help="Удалить критерий",
+                        st.button(":x:", key=f"criterion_remove_{criterion.id}_{view_key}", help="Удалить критерий",
                                   on_click=remove_criterion)
         if not disable_add_remove:
             st.button(":heavy_plus_sign:", key=f"criterion_add_{view_key}", help="Добавить критерий",
                       on_click=lambda: criteria.append(Criterion()))
-        problems = CriteriaView._validate_criteria(criteria)
+        problems.extend(CriteriaView._validate_criteria(criteria))
         if not problems.has_errors:
-            serialized_criteria = convert_to_csv(Criterion.to_dataframe(criteria))
-            st.download_button("Скачать критерии", serialized_criteria,
-                               file_name=Criterion.FILE_NAME,
-                               mime="text/csv")
+            version = Criterion.get_version(criteria)
+            DownloadView.create("Скачать критерии", lambda: du.convert_to_csv(Criterion.to_dataframe(criteria)),
+                                version, file_name=Criterion.FILE_NAME, mime="text/csv",
+                                key=f"criteria_download_{view_key}")
+            DownloadView.create("Скачать критерии (Parquet)",
+                                lambda: du.convert_to_parquet(Criterion.to_dataframe(criteria)), version,
+                                file_name=Criterion.PARQUET_FILE_NAME, mime="application/vnd.apache.parquet",
+                                key=f"criteria_download_parquet_{view_key}")
+            DownloadView.create("Скачать критерии (Arrow)",
+                                lambda: du.convert_to_arrow(Criterion.to_dataframe(criteria)), version,
+                                file_name=Criterion.ARROW_FILE_NAME, mime="application/vnd.apache.arrow.file",
+                                key=f"criteria_download_arrow_{view_key}")
         return problems
 
     @staticmethod
-    def _create_criterion_value_input(criterion: Criterion):
+    def _create_criterion_value_input(criterion: Criterion, key: str):
         def save_value(widget_key: str):
             criterion.value = st.session_state[widget_key]
 
-        key = State.generate_key()
-        st.number_input(Criterion.VALUE_TEXT, value=criterion.value, min_value=0.0, max_value=1.0, key=key,
+        State.sync(key, criterion.value)
+        st.number_input(Criterion.VALUE_TEXT, min_value=0.0, max_value=1.0, key=key,
                         label_visibility="collapsed", on_change=lambda: save_value(key))
 
     @staticmethod
@@ -1,14 +1,39 @@
+from typing import Hashable, Iterable
 import pandas as pd
 
+import dataframe_utils as du
+
+from identity import next_id
+
 
 class Criterion:
     NAME_TEXT = "Название"
     VALUE_TEXT = "Значимость"
     FILE_NAME = "criteria.csv"
+    PARQUET_FILE_NAME = "criteria.parquet"
+    ARROW_FILE_NAME = "criteria.arrow"
+
+    __slots__ = ("value", "name", "_id")
 
     def __init__(self, name: str = "", value: float = 0.0):
         self.value = value
         self.name = name
+        self._id = next_id()
+
+    @property
+    def id(self) -> int:
+        """
+        Stays the same while the criterion is edited, unlike its index which changes when preceding ones are removed.
+        """
+        return self._id
+
+    @staticmethod
+    def get_version(criteria: list["Criterion"]) -> Hashable:
+        """
+        Get a value which changes whenever either of the criteria does.
+        There are just a few criteria, so their contents serve as a version.
+        """
+        return tuple((criterion.name, criterion.value) for criterion in criteria)
 
     @staticmethod
     def to_dataframe(criteria: list["Criterion"]) -> pd.DataFrame:
@@ -25,4 +50,14 @@ class Criterion:
 
     @staticmethod
     def from_dataframe(dataframe: pd.DataFrame) -> list["Criterion"]:
-        return [Criterion(row[Criterion.NAME_TEXT], row[Criterion.VALUE_TEXT]) for _, row in dataframe.iterrows()]
+        return Criterion.from_dataframes([dataframe])
+
+    @staticmethod
+    def from_dataframes(dataframes: Iterable[pd.DataFrame]) -> list["Criterion"]:
+        criteria = []
+        for dataframe in dataframes:
+            du.check_columns(dataframe, [Criterion.NAME_TEXT, Criterion.VALUE_TEXT])
+            names = dataframe[Criterion.NAME_TEXT].tolist()
+            values = dataframe[Criterion.VALUE_TEXT].astype(float).tolist()
+            criteria.extend(Criterion(name, value) for name, value in zip(names, values))
+        return criteria
@@ -1,25 +1,256 @@
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence
 from io import BytesIO
+import zipfile
 import streamlit as st
+import pyarrow.parquet as pq
+import pyarrow.ipc
+import pyarrow as pa
 import pandas as pd
+import numpy as np
+import openpyxl
+
+
+# Fraction of a file which has been read so far, from 0 to 1
+ProgressListener = Callable[[float], None]
+
+# Number of rows parsed or written at once, bounds memory of a single chunk
+CHUNK_SIZE = 10_000
+
+# Title of the sheet of a single dataframe, the same one pandas uses by default
+EXCEL_SHEET_NAME = "Sheet1"
 
 
-@st.cache_data
 def convert_to_csv(dataframe: pd.DataFrame) -> bytes:
     return dataframe.to_csv(index=False).encode("utf-8")
 
 
-@st.cache_data
 def convert_to_excel(dataframe: pd.DataFrame) -> bytes:
+    return write_excel([(EXCEL_SHEET_NAME, iter_rows(dataframe))])
+
+
+def write_excel(sheets: Iterable[tuple[str, Iterable[Sequence[Any]]]]) -> bytes:
+    """
+    Write a workbook sheet by sheet and row by row.
+    Rows are streamed straight to the file instead of building the whole workbook in memory,
+    so sheets and rows may be generated lazily.
+
+    :param sheets: pairs of sheet titles and rows, the first row of each sheet is its header
+    """
+    workbook = openpyxl.Workbook(write_only=True)
+    for title, rows in sheets:
+        sheet = workbook.create_sheet(title)
+        for row in rows:
+            sheet.append(row)
     in_memory_writer = BytesIO()
-    dataframe.to_excel(in_memory_writer, index=False)
-    in_memory_writer.seek(0, 0)
-    return in_memory_writer.read()
+    workbook.save(in_memory_writer)
+    return in_memory_writer.getvalue()
+
+
+def iter_rows(dataframe: pd.DataFrame, chunk_size: int = CHUNK_SIZE) -> Iterator[Sequence[Any]]:
+    """
+    Iterate over the header and rows of the dataframe.
+    Values are converted to builtin types chunk by chunk, which is much faster than doing so for each cell.
+    """
+    yield list(dataframe.columns)
+    for start in range(0, len(dataframe), chunk_size):
+        chunk = dataframe.iloc[start:start + chunk_size]
+        yield from zip(*[chunk[column].tolist() for column in chunk.columns])
 
 
-def parse_dataframe(file: BytesIO) -> pd.DataFrame:
+def convert_to_parquet(dataframe: pd.DataFrame) -> bytes:
+    sink = pa.BufferOutputStream()
+    pq.write_table(pa.Table.from_pandas(dataframe, preserve_index=False), sink)
+    return sink.getvalue().to_pybytes()
+
+
+def convert_to_arrow(dataframe: pd.DataFrame) -> bytes:
+    table = pa.Table.from_pandas(dataframe, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def read_chunks(
+        file: BytesIO,
+        chunk_size: int = CHUNK_SIZE,
+        on_progress: Optional[ProgressListener] = None,
+        columns: Optional[list[str]] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Parse the file lazily, so only a single chunk of rows is kept in memory at once.
+    At least one chunk is yielded even if there are no rows, so columns can always be checked.
+
+    :param columns: columns to be read, all of them by default.
+                    Missing columns are skipped, so they can be reported by `check_columns`
+    :raise RuntimeError: if the file is either empty, corrupted or has unsupported extension
+    """
+    on_progress = on_progress if on_progress is not None else lambda fraction: None
     if file.name.endswith(".xlsx"):
-        return pd.read_excel(file)
+        yield from _read_excel_chunks(file, chunk_size, on_progress, columns)
     elif file.name.endswith(".csv"):
-        return pd.read_csv(file)
+        yield from _read_csv_chunks(file, chunk_size, on_progress, columns)
+    elif file.name.endswith(".parquet"):
+        yield from _read_parquet_chunks(file, chunk_size, on_progress, columns)
+    elif file.name.endswith(".arrow") or file.name.endswith(".feather"):
+        yield from _read_arrow_chunks(file, chunk_size, on_progress, columns)
     else:
         raise RuntimeError(f"Unsupported extension of file '{file.name}'")
+    on_progress(1.0)
+
+
+def _read_csv_chunks(
+        file: BytesIO,
+        chunk_size: int,
+        on_progress: ProgressListener,
+        columns: Optional[list[str]]
+) -> Iterator[pd.DataFrame]:
+    size = file.seek(0, 2)
+    file.seek(0)
+    use_columns = set(columns).__contains__ if columns is not None else None
+    try:
+        reader = pd.read_csv(file, chunksize=chunk_size, usecols=use_columns)
+    except pd.errors.EmptyDataError:
+        raise RuntimeError("Файл пуст")
+    except pd.errors.ParserError as error:
+        raise RuntimeError(f"Не удалось прочитать файл: {error}")
+    with reader:
+        try:
+            for chunk in reader:
+                yield chunk
+                on_progress(min(file.tell() / size, 1.0))
+        except pd.errors.ParserError as error:  # Malformed rows are only found when their chunk is parsed
+            raise RuntimeError(f"Не удалось прочитать файл: {error}")
+
+
+def _read_excel_chunks(
+        file: BytesIO,
+        chunk_size: int,
+        on_progress: ProgressListener,
+        columns: Optional[list[str]]
+) -> Iterator[pd.DataFrame]:
+    # Read-only mode streams rows from the sheet instead of building the whole workbook in memory
+    try:
+        workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, KeyError) as error:
+        raise RuntimeError(f"Не удалось прочитать файл: {error}")
+    try:
+        sheet = workbook.active
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            raise RuntimeError("Файл пуст")
+        row_count = max((sheet.max_row or 0) - 1, 1)
+        read_row_count = 0
+        has_chunks = False
+        while True:
+            chunk_rows = [row for _, row in zip(range(chunk_size), rows)]
+            if len(chunk_rows) == 0 and has_chunks:
+                break
+            has_chunks = True
+            read_row_count += len(chunk_rows)
+            dataframe = pd.DataFrame(chunk_rows, columns=list(header))
+            yield dataframe[_select_columns(dataframe.columns, columns)] if columns is not None else dataframe
+            on_progress(min(read_row_count / row_count, 1.0))
+    finally:
+        workbook.close()
+
+
+def _read_parquet_chunks(
+        file: BytesIO,
+        chunk_size: int,
+        on_progress: ProgressListener,
+        columns: Optional[list[str]]
+) -> Iterator[pd.DataFrame]:
+    with _open_columnar(file) as source:
+        try:
+            parquet_file = pq.ParquetFile(source)
+        except pa.ArrowException as error:
+            raise RuntimeError(f"Не удалось прочитать файл: {error}")
+        schema = parquet_file.schema_arrow
+        columns = _select_columns(schema.names, columns) if columns is not None else schema.names
+        row_count = max(parquet_file.metadata.num_rows, 1)
+        read_row_count = 0
+        # Only the selected column chunks are decoded, the rest of the file isn't even touched
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            read_row_count += batch.num_rows
+            yield batch.to_pandas()
+            on_progress(min(read_row_count / row_count, 1.0))
+        if read_row_count == 0:
+            yield schema.empty_table().select(columns).to_pandas()
+
+
+def _read_arrow_chunks(
+        file: BytesIO,
+        chunk_size: int,
+        on_progress: ProgressListener,
+        columns: Optional[list[str]]
+) -> Iterator[pd.DataFrame]:
+    with _open_columnar(file) as source:
+        try:
+            reader = pa.ipc.open_file(source)
+        except pa.ArrowException as error:
+            raise RuntimeError(f"Не удалось прочитать файл: {error}")
+        columns = _select_columns(reader.schema.names, columns) if columns is not None else reader.schema.names
+        batches = [reader.get_batch(index) for index in range(reader.num_record_batches)]
+        row_count = max(sum(batch.num_rows for batch in batches), 1)
+        read_row_count = 0
+        # Batches refer to the file's memory without copying, so only the converted chunk takes extra memory
+        for batch in batches:
+            batch = batch.select(columns)
+            for offset in range(0, batch.num_rows, chunk_size):
+                chunk = batch.slice(offset, chunk_size)
+                read_row_count += chunk.num_rows
+                yield chunk.to_pandas()
+                on_progress(min(read_row_count / row_count, 1.0))
+        if read_row_count == 0:
+            yield reader.schema.empty_table().select(columns).to_pandas()
+
+
+def _open_columnar(file: BytesIO) -> pa.NativeFile:
+    if isinstance(file, BytesIO):
+        return pa.BufferReader(pa.py_buffer(file.getbuffer()))  # Uploads are in memory already, so they aren't copied
+    return pa.memory_map(file.name)
+
+
+def _select_columns(names: Iterable[str], columns: list[str]) -> list[str]:
+    available_names = set(names)
+    return [column for column in columns if column in available_names]
+
+
+@contextmanager
+def show_progress(text: str) -> Iterator[ProgressListener]:
+    """
+    Display a progress bar until the block is exited.
+    """
+    progress_bar = st.progress(0.0, text=text)
+    try:
+        yield lambda fraction: progress_bar.progress(fraction, text=text)
+    finally:
+        progress_bar.empty()
+
+
+def check_columns(dataframe: pd.DataFrame, columns: list[str]):
+    """
+    Make sure the dataframe contains all the required columns before loading anything from it.
+
+    :raise RuntimeError: if some of the columns are missing
+    """
+    missing_columns = [column for column in columns if column not in dataframe.columns]
+    if len(missing_columns) > 0:
+        raise RuntimeError(f"В файле отсутствуют столбцы: {', '.join(missing_columns)}")
+
+
+def to_floats(dataframe: pd.DataFrame) -> np.ndarray:
+    """
+    Convert all the values of the dataframe to floats, missing ones become nan.
+
+    :raise RuntimeError: if some of the values are not numbers
+    """
+    try:
+        return dataframe.to_numpy(dtype=float)
+    except (ValueError, TypeError):
+        columns = [str(column) for column in dataframe.columns
+                   if pd.to_numeric(dataframe[column], errors="coerce").isna().sum() > dataframe[column].isna().sum()]
+        raise RuntimeError(f"Значения в столбцах должны быть числами: {', '.join(columns)}")
@@ -0,0 +1,68 @@
+from datetime import date, timedelta
+from enum import Enum, unique
+import numpy as np
+
+
+@unique
+class Granularity(Enum):
+    DAY = "D"
+    WEEK = "W"
+    MONTH = "M"
+
+
+class DatePeriod:
+    """
+    Period between two dates split into steps of the same granularity.
+    Unlike `Period`, it isn't limited to a single year.
+    Weeks are counted from the first date rather than from Mondays.
+    """
+
+    __slots__ = ("first_date", "last_date", "granularity")
+
+    def __init__(self, first_date: date, last_date: date, granularity: Granularity = Granularity.MONTH):
+        if last_date < first_date:
+            raise RuntimeError("Конец периода раньше его начала")
+        self.first_date = first_date
+        self.last_date = last_date
+        self.granularity = granularity
+
+    @property
+    def length(self) -> int:
+        """
+        Number of steps covered with this period, including its both ends.
+
+        >>> DatePeriod(date(2020, 1, 31), date(2020, 2, 1)).length
+        2
+        >>> DatePeriod(date(2020, 1, 1), date(2022, 12, 31)).length
+        36
+        >>> DatePeriod(date(2020, 1, 1), date(2020, 1, 14), Granularity.WEEK).length
+        2
+        >>> DatePeriod(date(2020, 1, 1), date(2020, 12, 31), Granularity.DAY).length
+        366
+        """
+        return int(self.get_indices(np.array([self.last_date], dtype="datetime64[D]"))[0]) + 1
+
+    def get_indices(self, dates: np.ndarray) -> np.ndarray:
+        """
+        Map dates to indices of steps they belong to.
+        Dates outside the period get indices either below zero or not less than its length.
+
+        :param dates: array of datetime64 values
+        """
+        if self.granularity == Granularity.MONTH:
+            first = np.datetime64(self.first_date, "M")
+            return (dates.astype("datetime64[M]") - first).astype(np.int64)
+        days = (dates.astype("datetime64[D]") - np.datetime64(self.first_date, "D")).astype(np.int64)
+        if self.granularity == Granularity.WEEK:
+            return np.floor_divide(days, 7)
+        return days
+
+    def get_date(self, index: int) -> date:
+        """
+        :return: the first date of the step
+        """
+        if self.granularity == Granularity.MONTH:
+            month_count = self.first_date.month - 1 + index
+            return date(self.first_date.year + month_count // 12, month_count % 12 + 1, 1)
+        days = 7 * index if self.granularity == Granularity.WEEK else index
+        return self.first_date + timedelta(days=days)
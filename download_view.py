@@ -0,0 +1,27 @@
+from typing import Callable, Hashable
+
+import streamlit as st
+
+from state import State
+from key import Key
+
+
+class DownloadView:
+    @staticmethod
+    def create(label: str, build: Callable[[], bytes], version: Hashable, file_name: str, mime: str, key: str):
+        """
+        Offer a file which is built only when it's requested.
+        Until then, a button preparing the file is shown instead of the download one.
+        The file is kept until the version changes, so reruns don't pay for serialization.
+
+        :param version: anything which changes whenever contents of the file do
+        """
+        payload_key = Key(f"{key}.payload", default_value=None)  # (version, contents of file)
+        payload = State.get(payload_key)
+        if payload is not None and payload[0] == version:
+            st.download_button(label, payload[1], key=key, file_name=file_name, mime=mime)
+        else:
+            if payload is not None:
+                State.put(payload_key, None)  # Outdated contents aren't kept in memory
+            st.button(label, key=f"{key}_prepare", help="Сформировать файл для скачивания",
+                      on_click=lambda: State.put(payload_key, (version, build())))
@@ -1,7 +1,16 @@
-from typing import Callable
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Iterable, Optional
+import os
+
+import numpy as np
 
 import collection_utils as cu
+import array_evaluators
 
+from supply_ledger import EXPECTED, ACTUAL
+from date_period import DatePeriod
+from criterion import Criterion
 from supplier import Supplier
 from product import Product
 from period import Period
@@ -9,76 +18,417 @@ from supply import Supply
 from pair import Pair
 
 
-def _sum_supplies(supplier: Supplier, products: list[Product], period: Period) -> Supply:
-    aggregated_quantities = {}
-    for product in products:
-        aggregated_quantity = Pair()
-        cu.extend(supplier.supplies, until_length=period.length, with_value=Supply)
-        for month_index in range(period.length):
-            supply = supplier.supplies[month_index]
-            quantity = cu.get_or_put(supply.quantities, key=product.name, default=Pair)
-            aggregated_quantity.expected += quantity.expected
-            aggregated_quantity.actual += quantity.actual
-        aggregated_quantities[product.name] = aggregated_quantity
-    return Supply(aggregated_quantities)
-
-
-def _calculate_criterion1(supplier: Supplier, products: list[Product], period: Period) -> float:
-    aggregated_supply = _sum_supplies(supplier, products, period)  # product.name -> Q(exp), Q(act)
-    denominator = 0.0
-    nominator = 0.0
-    for product in products:
-        price = cu.get_or_put(supplier.prices, key=product.name, default=Pair)
-        quantity = aggregated_supply.quantities[product.name]
-        denominator += price.actual * quantity.expected
-        nominator += price.actual * quantity.actual
-    return abs(1 - nominator / denominator)
+SUPPLIER = "supplier"
+PRODUCTS = "products"
+PERIOD = "period"
+QUANTITY_AGGREGATES = "quantity.aggregates"
+PRICE_AGGREGATES = "price.aggregates"
 
+# Number of steps aggregated at once, bounds memory of temporary arrays by (step x product) floats
+_STEPS_PER_CHUNK = 4096
 
-def _calculate_criterion2(supplier: Supplier, products: list[Product], period: Period) -> float:
-    aggregated_supply = _sum_supplies(supplier, products, period)  # product.name -> Q(exp), Q(act)
-    denominator = 0.0
-    nominator = 0.0
-    for product in products:
-        price = cu.get_or_put(supplier.prices, key=product.name, default=Pair)
-        quantity = aggregated_supply.quantities[product.name]
-        denominator += price.expected * quantity.actual
-        nominator += price.actual * quantity.actual
-    return nominator / denominator
 
+class QuantityAggregates:
+    """
+    Everything the criteria need to know about supplies of a single supplier,
+    collected within a single pass over its month x product grid.
+    """
 
-def _calculate_criterion3(supplier: Supplier, products: list[Product], period: Period) -> float:
-    cu.extend(supplier.supplies, until_length=period.length, with_value=Supply)
-    denominator = 0.0
-    nominator = 0.0
-    for product in products:
-        for month_index in range(period.length):
-            supply = supplier.supplies[month_index]
-            quantity = cu.get_or_put(supply.quantities, key=product.name, default=Pair)
-            nominator += abs(quantity.actual - quantity.expected)
-            denominator += quantity.expected
-    return nominator / denominator
+    def __init__(self):
+        self.supply = Supply()  # product.name -> Q(exp), Q(act) summed over the period
+        self.expected_quantity = 0.0  # sum of Q(exp)
+        self.absolute_deviation = 0.0  # sum of |Q(act) - Q(exp)|
+        self.relative_deviation = 0.0  # sum of |1 - Q(act) / Q(exp)| for Q(exp) != 0
+        self.undefined_relative_deviations = 0  # number of Q(exp) == 0
+
+    def add(self, quantity: Pair, sign: float = 1.0):
+        self.expected_quantity += sign * quantity.expected
+        self.absolute_deviation += sign * abs(quantity.actual - quantity.expected)
+        if quantity.expected == 0.0:
+            self.undefined_relative_deviations += int(sign)
+        else:
+            self.relative_deviation += sign * abs(1.0 - quantity.actual / quantity.expected)
+
+    def add_chunk(self, products: list[Product], quantities: np.ndarray):
+        """
+        Accumulate a chunk of consecutive steps.
+
+        :param quantities: array of shape (step, product, {expected, actual})
+        """
+        expected = quantities[..., EXPECTED]
+        actual = quantities[..., ACTUAL]
+        for product, (total_expected, total_actual) in zip(products, quantities.sum(axis=0).tolist()):
+            total = cu.get_or_put(self.supply.quantities, key=product.name, default=Pair)
+            total.expected += total_expected
+            total.actual += total_actual
+        self.expected_quantity += float(expected.sum())
+        self.absolute_deviation += float(np.abs(actual - expected).sum())
+        is_defined = expected != 0.0
+        self.relative_deviation += float(np.abs(1.0 - actual[is_defined] / expected[is_defined]).sum())
+        self.undefined_relative_deviations += int(is_defined.size - np.count_nonzero(is_defined))
+
+    def add_missing(self, products: list[Product], step_count: int):
+        """
+        Accumulate steps without supplies, which is the same as adding a chunk of zeros.
+        """
+        for product in products:
+            cu.get_or_put(self.supply.quantities, key=product.name, default=Pair)
+        self.undefined_relative_deviations += step_count * len(products)
 
 
-def _calculate_criterion4(supplier: Supplier, products: list[Product], period: Period) -> float:
-    cu.extend(supplier.supplies, until_length=period.length, with_value=Supply)
-    result = 0.0
+class PriceAggregates:
+    """
+    Price-weighted totals of supplies of a single supplier.
+    """
+
+    def __init__(self):
+        self.actual_price_expected_quantity = 0.0  # sum of P(act) * Q(exp)
+        self.actual_price_actual_quantity = 0.0  # sum of P(act) * Q(act)
+        self.expected_price_actual_quantity = 0.0  # sum of P(exp) * Q(act)
+
+    def add(self, price: Pair, aggregated_quantity: Pair, sign: float = 1.0):
+        self.actual_price_expected_quantity += sign * price.actual * aggregated_quantity.expected
+        self.actual_price_actual_quantity += sign * price.actual * aggregated_quantity.actual
+        self.expected_price_actual_quantity += sign * price.expected * aggregated_quantity.actual
+
+
+def _aggregate_quantities(supplier: Supplier, products: list[Product], period: Period) -> QuantityAggregates:
+    aggregates = QuantityAggregates()
+    quantities = supplier.supplies.get_quantities(products, period.length)  # step x product x {Q(exp), Q(act)}
+    for start in range(0, period.length, _STEPS_PER_CHUNK):
+        aggregates.add_chunk(products, quantities[start:start + _STEPS_PER_CHUNK])
+    return aggregates
+
+
+def _aggregate_prices(
+        supplier: Supplier,
+        products: list[Product],
+        quantity_aggregates: QuantityAggregates
+) -> PriceAggregates:
+    aggregates = PriceAggregates()
     for product in products:
-        for month_index in range(period.length):
-            supply = supplier.supplies[month_index]
-            quantity = cu.get_or_put(supply.quantities, key=product.name, default=Pair)
-            result += abs(1.0 - quantity.actual / quantity.expected)
-    return result
-
-
-_EVALUATORS: dict[str, Callable[[Supplier, list[Product], Period], float]] = {
-    "Объем": _calculate_criterion1,
-    "Цена": _calculate_criterion2,
-    "Ассортимент": _calculate_criterion3,
-    "Ритмичность": _calculate_criterion4,
+        price = supplier.get_price(product.name)
+        aggregates.add(price, quantity_aggregates.supply.quantities[product.name])
+    return aggregates
+
+
+def _calculate_criterion1(aggregates: PriceAggregates) -> float:
+    return abs(1 - aggregates.actual_price_actual_quantity / aggregates.actual_price_expected_quantity)
+
+
+def _calculate_criterion2(aggregates: PriceAggregates) -> float:
+    return aggregates.actual_price_actual_quantity / aggregates.expected_price_actual_quantity
+
+
+def _calculate_criterion3(aggregates: QuantityAggregates) -> float:
+    return aggregates.absolute_deviation / aggregates.expected_quantity
+
+
+def _calculate_criterion4(aggregates: QuantityAggregates) -> float:
+    if aggregates.undefined_relative_deviations > 0:
+        raise ZeroDivisionError("float division by zero")
+    return aggregates.relative_deviation
+
+
+# Intermediate name -> (names of intermediates it depends on, function calculating it from them)
+_INTERMEDIATES: dict[str, tuple[list[str], Callable[..., Any]]] = {
+    SUPPLIER: ([], lambda: None),  # Is provided by evaluation context
+    PRODUCTS: ([], lambda: None),  # Is provided by evaluation context
+    PERIOD: ([], lambda: None),  # Is provided by evaluation context
+    QUANTITY_AGGREGATES: ([SUPPLIER, PRODUCTS, PERIOD], _aggregate_quantities),
+    PRICE_AGGREGATES: ([SUPPLIER, PRODUCTS, QUANTITY_AGGREGATES], _aggregate_prices),
+}
+
+# Criterion.name -> (names of intermediates it depends on, function calculating score from them)
+_EVALUATORS: dict[str, tuple[list[str], Callable[..., float]]] = {
+    "Объем": ([PRICE_AGGREGATES], _calculate_criterion1),
+    "Цена": ([PRICE_AGGREGATES], _calculate_criterion2),
+    "Ассортимент": ([QUANTITY_AGGREGATES], _calculate_criterion3),
+    "Ритмичность": ([QUANTITY_AGGREGATES], _calculate_criterion4),
 }
 
 
+def register_intermediate(name: str, dependencies: list[str], calculate: Callable[..., Any]):
+    """
+    Register a value which is calculated once per evaluation
+    and can be shared among several criteria.
+    Since dependencies must be registered beforehand, intermediates always form a DAG.
+
+    :param calculate: function accepting values of dependencies in the same order
+    """
+    if name in _INTERMEDIATES:
+        raise RuntimeError(f"Intermediate '{name}' has already been registered")
+    _check_dependencies(dependencies)
+    _INTERMEDIATES[name] = (dependencies, calculate)
+
+
+# Names of criteria whose registered evaluators have array counterparts, see `evaluate_many`
+_ARRAY_CRITERION_NAMES = set(array_evaluators.CRITERION_NAMES)
+
+
+def register_evaluator(criterion_name: str, dependencies: list[str], calculate: Callable[..., float]):
+    """
+    Register a function calculating a score of a supplier for the criterion.
+
+    :param calculate: function accepting values of dependencies in the same order
+    """
+    _check_dependencies(dependencies)
+    _EVALUATORS[criterion_name] = (dependencies, calculate)
+    _ARRAY_CRITERION_NAMES.discard(criterion_name)  # The array counterpart no longer gives the same scores
+
+
+def _check_dependencies(dependencies: list[str]):
+    for dependency in dependencies:
+        if dependency not in _INTERMEDIATES:
+            raise RuntimeError(f"Unknown intermediate '{dependency}'")
+
+
+class _Context:
+    """
+    Lazily calculates intermediates, so each of them is evaluated at most once
+    and only if it's required by some of the active criteria.
+    """
+
+    def __init__(self, intermediates: dict[str, Any]):
+        self._intermediates = intermediates
+
+    def get(self, name: str) -> Any:
+        if name not in self._intermediates:
+            dependencies, calculate = _INTERMEDIATES[name]
+            self._intermediates[name] = calculate(*[self.get(dependency) for dependency in dependencies])
+        return self._intermediates[name]
+
+    # Criterion.name -> score
+    def evaluate(self, criteria: Optional[list[Criterion]]) -> dict[str, float]:
+        return self.evaluate_names(_get_criterion_names(criteria))
+
+    # Criterion.name -> score
+    def evaluate_names(self, criterion_names: list[str]) -> dict[str, float]:
+        scores = {}
+        for criterion_name in criterion_names:
+            dependencies, calculate = _EVALUATORS[criterion_name]
+            scores[criterion_name] = calculate(*[self.get(dependency) for dependency in dependencies])
+        return scores
+
+
+def _get_criterion_names(criteria: Optional[list[Criterion]]) -> list[str]:
+    if criteria is None:
+        return list(_EVALUATORS.keys())
+    return [criterion.name for criterion in criteria if criterion.name in _EVALUATORS]
+
+
+# Criterion.name -> score
+def evaluate(
+        supplier: Supplier,
+        products: list[Product],
+        period: Period,
+        criteria: Optional[list[Criterion]] = None
+) -> dict[str, float]:
+    """
+    Evaluate the supplier against the criteria.
+    Criteria without registered evaluators are skipped.
+    The supplier is not modified, so several threads can evaluate it at once.
+
+    :param criteria: active criteria, all the registered ones are evaluated by default
+    """
+    context = _Context({SUPPLIER: supplier, PRODUCTS: products, PERIOD: period})
+    return context.evaluate(criteria)
+
+
 # Criterion.name -> score
-def evaluate(supplier: Supplier, products: list[Product], period: Period) -> dict[str, float]:
-    return {criterion_name: evaluator(supplier, products, period) for criterion_name, evaluator in _EVALUATORS.items()}
+def evaluate_history(
+        supplier: Supplier,
+        products: list[Product],
+        period: DatePeriod,
+        steps: Iterable[np.ndarray],
+        criteria: Optional[list[Criterion]] = None
+) -> dict[str, float]:
+    """
+    Evaluate the supplier against the criteria using supplies streamed chunk by chunk
+    rather than the ones of its ledger, so histories of any length can be evaluated in bounded memory.
+    Prices are still taken from the supplier.
+    Steps of the period which are missing from the stream are treated as zeros.
+
+    :param steps: chunks of quantities of shape (step, product, {expected, actual}),
+                  each step of the period must occur at most once, see `SupplyHistory.read_steps`
+    """
+    aggregates = QuantityAggregates()
+    step_count = 0
+    for chunk in steps:
+        aggregates.add_chunk(products, chunk)
+        step_count += len(chunk)
+    aggregates.add_missing(products, max(period.length - step_count, 0))
+    context = _Context({SUPPLIER: supplier, PRODUCTS: products, PERIOD: period, QUANTITY_AGGREGATES: aggregates})
+    return context.evaluate(criteria)
+
+
+# Number of chunks each worker is going to process on average, so faster workers can pick up the slack
+_CHUNKS_PER_WORKER = 4
+
+
+# [Criterion.name -> score] for every supplier
+def evaluate_many(
+        suppliers: list[Supplier],
+        products: list[Product],
+        period: Period,
+        criteria: Optional[list[Criterion]] = None,
+        max_workers: Optional[int] = None
+) -> list[dict[str, float]]:
+    """
+    Evaluate a batch of suppliers using a pool of worker processes, the scores are the same as the ones of `evaluate`.
+    Supplies and prices are packed straight into shared memory, so no model objects are pickled.
+    Only built-in criteria have array counterparts which are scored by workers,
+    the rest of the registered criteria are scored one supplier at a time in the calling process.
+
+    :param criteria: active criteria, all the registered ones are evaluated by default
+    :param max_workers: number of worker processes, defaults to the number of CPUs
+    :return: scores in the same order as the suppliers
+    :raise ZeroDivisionError: wherever `evaluate` divides by zero, nan quantities or prices yield nan scores instead
+    """
+    max_workers = max_workers if max_workers is not None else os.cpu_count() or 1
+    criterion_names = _get_criterion_names(criteria)
+    array_criterion_names = [name for name in criterion_names if name in _ARRAY_CRITERION_NAMES]
+    other_criterion_names = [name for name in criterion_names if name not in _ARRAY_CRITERION_NAMES]
+    if len(array_criterion_names) == 0:
+        results = [{} for _ in suppliers]
+    elif max_workers == 1 or len(suppliers) < 2:
+        quantities = array_evaluators.pack_quantities(suppliers, products, period)
+        prices = array_evaluators.pack_prices(suppliers, products)
+        results = _unpack_scores(array_evaluators.evaluate_packed(quantities, prices, array_criterion_names),
+                                 len(suppliers))
+    else:
+        results = _evaluate_in_workers(suppliers, products, period, array_criterion_names, max_workers)
+    if len(other_criterion_names) > 0:
+        for supplier, supplier_scores in zip(suppliers, results):
+            context = _Context({SUPPLIER: supplier, PRODUCTS: products, PERIOD: period})
+            supplier_scores.update(context.evaluate_names(other_criterion_names))
+    # Scores follow the order of the criteria regardless of the way they have been calculated
+    return [{name: supplier_scores[name] for name in criterion_names} for supplier_scores in results]
+
+
+def _evaluate_in_workers(
+        suppliers: list[Supplier],
+        products: list[Product],
+        period: Period,
+        criterion_names: list[str],
+        max_workers: int
+) -> list[dict[str, float]]:
+    quantities_shape = array_evaluators.get_quantities_shape(suppliers, products, period)
+    prices_shape = array_evaluators.get_prices_shape(suppliers, products)
+    quantities_memory = _allocate(quantities_shape)
+    prices_memory = _allocate(prices_shape)
+    try:
+        quantities = np.ndarray(quantities_shape, dtype=float, buffer=quantities_memory.buf)
+        prices = np.ndarray(prices_shape, dtype=float, buffer=prices_memory.buf)
+        array_evaluators.pack_quantities(suppliers, products, period, out=quantities)
+        array_evaluators.pack_prices(suppliers, products, out=prices)
+        del quantities, prices  # Views must be released before shared memory is closed
+        chunk_count = min(len(suppliers), max_workers * _CHUNKS_PER_WORKER)
+        bounds = [len(suppliers) * chunk_index // chunk_count for chunk_index in range(chunk_count + 1)]
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(_evaluate_shared, quantities_memory.name, quantities_shape,
+                                prices_memory.name, prices_shape, criterion_names, start, stop)
+                for start, stop in zip(bounds, bounds[1:])
+            ]
+            results = []
+            for future in futures:
+                results.extend(future.result())
+            return results
+    finally:
+        for memory in (quantities_memory, prices_memory):
+            memory.close()
+            memory.unlink()
+
+
+def _allocate(shape: tuple[int, ...]) -> SharedMemory:
+    return SharedMemory(create=True, size=max(int(np.prod(shape)) * np.dtype(float).itemsize, 1))
+
+
+def _evaluate_shared(
+        quantities_name: str,
+        quantities_shape: tuple[int, ...],
+        prices_name: str,
+        prices_shape: tuple[int, ...],
+        criterion_names: list[str],
+        start: int,
+        stop: int
+) -> list[dict[str, float]]:
+    quantities_memory = SharedMemory(name=quantities_name)
+    prices_memory = SharedMemory(name=prices_name)
+    try:
+        quantities = np.ndarray(quantities_shape, dtype=float, buffer=quantities_memory.buf)[start:stop]
+        prices = np.ndarray(prices_shape, dtype=float, buffer=prices_memory.buf)[start:stop]
+        try:
+            scores = array_evaluators.evaluate_packed(quantities, prices, criterion_names)
+        finally:
+            del quantities, prices  # Views must be released before shared memory is closed
+        return _unpack_scores(scores, stop - start)
+    finally:
+        quantities_memory.close()
+        prices_memory.close()
+
+
+def _unpack_scores(scores: dict[str, np.ndarray], supplier_count: int) -> list[dict[str, float]]:
+    score_lists = {criterion_name: criterion_scores.tolist() for criterion_name, criterion_scores in scores.items()}
+    return [
+        {criterion_name: criterion_scores[supplier_index] for criterion_name, criterion_scores in score_lists.items()}
+        for supplier_index in range(supplier_count)
+    ]
+
+
+class IncrementalEvaluator:
+    """
+    Keeps running aggregates of a single supplier, so re-scoring it
+    after a single quantity or price has been edited takes O(1).
+    Every edit must be reported with either `on_quantity_changed` or `on_price_changed`.
+    Since deltas are applied to floating sums, scores may differ
+    from the ones of `evaluate` within a rounding error.
+    Intermediates of custom criteria are not tracked and are recalculated on every evaluation.
+    """
+
+    def __init__(self, supplier: Supplier, products: list[Product], period: Period):
+        self._products = list(products)
+        self._period = period
+        self._quantity_aggregates = _aggregate_quantities(supplier, products, period)
+        self._price_aggregates = _aggregate_prices(supplier, products, self._quantity_aggregates)
+        self._period_length = period.length
+        self._supplier = supplier
+
+    def is_tracking(self, supplier: Supplier, products: list[Product], period: Period) -> bool:
+        """
+        Check whether aggregates are still valid for the supplier,
+        i.e. neither the list of products nor the length of the period have changed.
+        """
+        return supplier is self._supplier and period.length == self._period_length \
+            and [product.name for product in products] == [product.name for product in self._products]
+
+    def on_quantity_changed(self, product_name: str, old_quantity: Pair, new_quantity: Pair):
+        aggregated_quantity = self._quantity_aggregates.supply.quantities.get(product_name)
+        if aggregated_quantity is None:
+            return  # Product isn't evaluated
+        price = self._supplier.get_price(product_name)
+        self._price_aggregates.add(price, aggregated_quantity, sign=-1.0)
+        aggregated_quantity.expected += new_quantity.expected - old_quantity.expected
+        aggregated_quantity.actual += new_quantity.actual - old_quantity.actual
+        self._price_aggregates.add(price, aggregated_quantity)
+        self._quantity_aggregates.add(old_quantity, sign=-1.0)
+        self._quantity_aggregates.add(new_quantity)
+
+    def on_price_changed(self, product_name: str, old_price: Pair, new_price: Pair):
+        aggregated_quantity = self._quantity_aggregates.supply.quantities.get(product_name)
+        if aggregated_quantity is None:
+            return  # Product isn't evaluated
+        self._price_aggregates.add(old_price, aggregated_quantity, sign=-1.0)
+        self._price_aggregates.add(new_price, aggregated_quantity)
+
+    # Criterion.name -> score
+    def evaluate(self, criteria: Optional[list[Criterion]] = None) -> dict[str, float]:
+        context = _Context({
+            SUPPLIER: self._supplier,
+            PRODUCTS: self._products,
+            PERIOD: self._period,
+            QUANTITY_AGGREGATES: self._quantity_aggregates,
+            PRICE_AGGREGATES: self._price_aggregates,
+        })
+        return context.evaluate(criteria)
@@ -2,6 +2,7 @@ from contractors_view import ContractorsView
 from criteria_view import CriteriaView
 from problems_view import ProblemsView
 from result_view import ResultView
+from contractor_table import ContractorTable
 from contractor import Contractor
 from criterion import Criterion
 from state import State
@@ -12,16 +13,16 @@ class FirstApp:
     TITLE = "Выбор на основе экспертных оценок"
     ID = "first.app"
 
-    _INITIAL_CONTRACTORS = [
-        Contractor("Рога и Копыта", {"Цена": 3, "Качество": 4, "Удаленность": 2})
-    ]
-
     _INITIAL_CRITERIA = [
         Criterion("Цена", 0.35),
         Criterion("Качество", 0.55),
         Criterion("Удаленность", 0.1),
     ]
 
+    _INITIAL_CONTRACTORS = ContractorTable.from_contractors(_INITIAL_CRITERIA, [
+        Contractor("Рога и Копыта", {"Цена": 3, "Качество": 4, "Удаленность": 2})
+    ])
+
     _CONTRACTORS_KEY = Key(f"{ID}.contractors", default_value=_INITIAL_CONTRACTORS)
     _CRITERIA_KEY = Key(f"{ID}.criteria", default_value=_INITIAL_CRITERIA)
 
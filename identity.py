@@ -0,0 +1,21 @@
+import threading
+
+
+_next_id = 1
+_lock = threading.Lock()  # Sessions are run in separate threads
+
+
+def next_ids(count: int) -> range:
+    """
+    Generate identities of new models, e.g. rows of a table.
+    Unlike versions, an identity stays the same while the model is edited, so it can be a part of widget keys.
+    """
+    global _next_id
+    with _lock:
+        first_id = _next_id
+        _next_id += count
+    return range(first_id, first_id + count)
+
+
+def next_id() -> int:
+    return next_ids(1)[0]
@@ -0,0 +1,83 @@
+"""
+Measure memory footprint of the model per supplier and per contractor at several dataset sizes.
+Run with `python memory_benchmark.py` and compare its output across releases.
+"""
+from typing import Callable
+import tracemalloc
+
+import numpy as np
+
+from contractor_table import ContractorTable
+from supply_ledger import SupplyLedger
+from contractor import Contractor
+from criterion import Criterion
+from supplier import Supplier
+from pair import Pair
+
+
+_SUPPLIER_COUNTS = [10, 100, 1000]
+_CONTRACTOR_COUNTS = [1000, 10_000, 100_000]
+_PRODUCT_COUNT = 40
+_MONTH_COUNT = 12
+_CRITERION_COUNT = 10
+
+
+def measure(build: Callable[[], object]) -> int:
+    """
+    :return: number of bytes which remain allocated by the built object
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        after = tracemalloc.get_traced_memory()[0]
+        del result
+        return after - before
+    finally:
+        tracemalloc.stop()
+
+
+def build_suppliers(count: int) -> list[Supplier]:
+    rng = np.random.default_rng(0)
+    product_names = [f"Товар {index}" for index in range(_PRODUCT_COUNT)]
+    suppliers = []
+    for index in range(count):
+        quantities = rng.uniform(1.0, 100.0, size=(_MONTH_COUNT, _PRODUCT_COUNT, 2))
+        price_values = rng.uniform(1.0, 100.0, size=(_PRODUCT_COUNT, 2)).tolist()
+        prices = {name: Pair(expected, actual) for name, (expected, actual) in zip(product_names, price_values)}
+        suppliers.append(Supplier(f"Поставщик {index}", SupplyLedger(list(product_names), quantities), prices))
+    return suppliers
+
+
+def build_contractors(count: int) -> list[Contractor]:
+    rng = np.random.default_rng(0)
+    criterion_names = [f"Критерий {index}" for index in range(_CRITERION_COUNT)]
+    scores = rng.integers(0, ContractorTable.MAX_SCORE + 1, size=(count, _CRITERION_COUNT)).tolist()
+    return [Contractor(f"Подрядчик {index}", dict(zip(criterion_names, row))) for index, row in enumerate(scores)]
+
+
+def build_contractor_table(count: int) -> ContractorTable:
+    criteria = [Criterion(f"Критерий {index}") for index in range(_CRITERION_COUNT)]
+    rng = np.random.default_rng(0)
+    names = [f"Подрядчик {index}" for index in range(count)]
+    scores = rng.integers(0, ContractorTable.MAX_SCORE + 1, size=(count, _CRITERION_COUNT), dtype=np.uint8)
+    return ContractorTable([criterion.name for criterion in criteria], names, scores)
+
+
+def main():
+    print(f"Suppliers ({_PRODUCT_COUNT} products, {_MONTH_COUNT} months):")
+    for count in _SUPPLIER_COUNTS:
+        size = measure(lambda: build_suppliers(count))
+        print(f"  {count:>7}: {size / count:>12,.0f} bytes per supplier")
+    print(f"Contractors ({_CRITERION_COUNT} criteria), list of objects:")
+    for count in _CONTRACTOR_COUNTS:
+        size = measure(lambda: build_contractors(count))
+        print(f"  {count:>7}: {size / count:>12,.0f} bytes per contractor")
+    print(f"Contractors ({_CRITERION_COUNT} criteria), table:")
+    for count in _CONTRACTOR_COUNTS:
+        size = measure(lambda: build_contractor_table(count))
+        print(f"  {count:>7}: {size / count:>12,.0f} bytes per contractor")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+from enum import Enum, unique
+from typing import Callable
+import math
+
+import streamlit as st
+import numpy as np
+
+
+@unique
+class SortOrder(Enum):
+    ORIGINAL = "Исходный порядок"
+    NAME = "По названию"
+    SCORE = "По баллу"
+
+
+class PagingView:
+    PAGE_SIZES = [10, 25, 50, 100]
+
+    @staticmethod
+    def create(
+            names: list[str],
+            get_total_scores: Callable[[], np.ndarray],
+            view_key: str,
+            higher_is_better: bool = True
+    ) -> list[int]:
+        """
+        Show search, sort and page controls for a list of named items.
+        Items are filtered and sorted on the server, so widgets are created only for the ones on the current page.
+
+        :param get_total_scores: function calculating scores of all the items, called only if sorting by score
+        :param higher_is_better: whether items with the highest scores go first (otherwise the lowest ones)
+        :return: indices of items on the current page
+        """
+        columns = st.columns([4, 2, 1])
+        with columns[0]:
+            query = st.text_input("Поиск", key=f"{view_key}_search", placeholder="Часть названия").strip()
+        with columns[1]:
+            order = st.selectbox("Сортировка", options=list(SortOrder), format_func=lambda option: option.value,
+                                 key=f"{view_key}_sort")
+        with columns[2]:
+            page_size = st.selectbox("На странице", options=PagingView.PAGE_SIZES, key=f"{view_key}_page_size")
+        indices = PagingView._select(names, get_total_scores, query, order, higher_is_better)
+        page_count = max(math.ceil(len(indices) / page_size), 1)
+        page_key = f"{view_key}_page"
+        if st.session_state.get(page_key, 1) > page_count:
+            st.session_state[page_key] = page_count  # The list has shrunk since the previous rerun
+        if page_count > 1:
+            page_number = st.number_input(f"Страница (из {page_count})", min_value=1, max_value=page_count,
+                                          key=page_key)
+        else:
+            page_number = 1
+        if query != "":
+            st.caption(f"Найдено: {len(indices)} из {len(names)}")
+        start = (page_number - 1) * page_size
+        return indices[start:start + page_size]
+
+    @staticmethod
+    def _select(
+            names: list[str],
+            get_total_scores: Callable[[], np.ndarray],
+            query: str,
+            order: SortOrder,
+            higher_is_better: bool
+    ) -> list[int]:
+        # Names aren't necessarily strings, e.g. the ones of models built elsewhere
+        if query != "":
+            query = query.casefold()
+            indices = [index for index, name in enumerate(names) if query in str(name).casefold()]
+        else:
+            indices = list(range(len(names)))
+        if order == SortOrder.NAME:
+            indices.sort(key=lambda index: str(names[index]).casefold())
+        elif order == SortOrder.SCORE:
+            total_scores = get_total_scores()[indices]
+            keys = -total_scores if higher_is_better else total_scores
+            keys = np.where(np.isnan(keys), np.inf, keys)  # Items without scores go last
+            indices = [indices[position] for position in np.argsort(keys, kind="stable").tolist()]
+        return indices
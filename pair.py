@@ -5,6 +5,8 @@ class Pair:
     EXPECTED_TEXT = "По договору"
     ACTUAL_TEXT = "По факту"
 
+    __slots__ = ("expected", "actual")
+
     def __init__(self, expected: float = 0.0, actual: float = 0.0):
         self.expected = expected
         self.actual = actual
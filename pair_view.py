@@ -1,32 +1,47 @@
+from typing import Callable, Optional
+
 import streamlit as st
 
 from state import State
 from pair import Pair
 
 
+# Invoked with a copy of the pair taken before the edit and the edited pair itself
+PairChangeListener = Callable[[Pair, Pair], None]
+
+
 class PairView:
     @staticmethod
-    def create(pair: Pair):
+    def create(pair: Pair, key: str, on_change: Optional[PairChangeListener] = None):
+        """
+        :param key: identity of the pair, e.g. the supplier, the month and the product it belongs to
+        """
         columns = st.columns(2)
         with columns[0]:
-            PairView._create_expected_input(pair)
+            PairView._create_expected_input(pair, f"{key}_expected", on_change)
         with columns[1]:
-            PairView._create_actual_input(pair)
+            PairView._create_actual_input(pair, f"{key}_actual", on_change)
 
     @staticmethod
-    def _create_expected_input(pair: Pair):
+    def _create_expected_input(pair: Pair, key: str, on_change: Optional[PairChangeListener]):
         def save_expected(widget_key: str):
+            old_pair = Pair(pair.expected, pair.actual)
             pair.expected = st.session_state[widget_key]
+            if on_change is not None:
+                on_change(old_pair, pair)
 
-        key = State.generate_key()
-        st.number_input(Pair.EXPECTED_TEXT, min_value=0.0, value=pair.expected,
-                        key=key, label_visibility="collapsed", on_change=lambda: save_expected(key))
+        State.sync(key, pair.expected)
+        st.number_input(Pair.EXPECTED_TEXT, min_value=0.0, key=key, label_visibility="collapsed",
+                        on_change=lambda: save_expected(key))
 
     @staticmethod
-    def _create_actual_input(pair: Pair):
+    def _create_actual_input(pair: Pair, key: str, on_change: Optional[PairChangeListener]):
         def save_actual(widget_key: str):
+            old_pair = Pair(pair.expected, pair.actual)
             pair.actual = st.session_state[widget_key]
+            if on_change is not None:
+                on_change(old_pair, pair)
 
-        key = State.generate_key()
-        st.number_input(Pair.ACTUAL_TEXT, min_value=0.0, value=pair.actual,
-                        key=key, label_visibility="collapsed", on_change=lambda: save_actual(key))
+        State.sync(key, pair.actual)
+        st.number_input(Pair.ACTUAL_TEXT, min_value=0.0, key=key, label_visibility="collapsed",
+                        on_change=lambda: save_actual(key))
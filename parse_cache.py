@@ -0,0 +1,94 @@
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, TypeVar
+from io import BytesIO
+import threading
+import hashlib
+import copy
+import sys
+
+import numpy as np
+
+
+TValue = TypeVar("TValue")
+
+# Total size of models kept in memory, least recently used ones are evicted first
+MAX_SIZE = 256 * 1024 * 1024
+
+_DIGEST_SIZE = 16
+
+# (digest of contents, extension, schema) -> (size of model, model)
+_entries: OrderedDict[tuple[bytes, str, Hashable], tuple[int, Any]] = OrderedDict()
+_total_size = 0
+_lock = threading.Lock()  # Sessions are run in separate threads
+
+
+def get_or_parse(file: BytesIO, schema: Hashable, parse: Callable[[], TValue]) -> TValue:
+    """
+    Get the model which has already been built from a file with the same contents and schema,
+    otherwise build it and keep it for later.
+    Models are deep-copied both ways, so the caller is free to modify the result.
+    Copies get versions of their own, so they are never mistaken for the cached models or each other.
+
+    :param schema: everything except the file which affects the model, e.g. names of products or criteria
+    :param parse: function building the model from the file, failures aren't cached
+    """
+    extension = file.name.rsplit(".", maxsplit=1)[-1]
+    key = (hashlib.blake2b(file.getbuffer(), digest_size=_DIGEST_SIZE).digest(), extension, schema)
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None:
+            _entries.move_to_end(key)
+    if entry is not None:
+        # Cached models are never modified, so they can be copied without holding the lock
+        return copy.deepcopy(entry[1])
+    model = parse()
+    size = _get_size(model)
+    if size <= MAX_SIZE:
+        _put(key, size, copy.deepcopy(model))
+    return model
+
+
+def _put(key: tuple[bytes, str, Hashable], size: int, model: Any):
+    global _total_size
+    with _lock:
+        previous_entry = _entries.pop(key, None)
+        if previous_entry is not None:
+            _total_size -= previous_entry[0]
+        _entries[key] = (size, model)
+        _total_size += size
+        while _total_size > MAX_SIZE:
+            _, (evicted_size, _) = _entries.popitem(last=False)
+            _total_size -= evicted_size
+
+
+def _get_size(model: Any) -> int:
+    """
+    Estimate memory taken by the model, including everything it refers to.
+    Files are usually compressed, so their sizes tell little about the ones of models.
+    """
+    size = 0
+    visited_ids = set()
+    values = [model]
+    while len(values) > 0:
+        value = values.pop()
+        if id(value) in visited_ids:
+            continue
+        visited_ids.add(id(value))
+        if isinstance(value, np.ndarray):
+            size += value.nbytes
+            continue
+        size += sys.getsizeof(value)
+        if isinstance(value, dict):
+            values.extend(value.keys())
+            values.extend(value.values())
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            values.extend(value)
+        elif not isinstance(value, (str, bytes, int, float, bool)) and value is not None:
+            if hasattr(value, "__dict__"):
+                values.extend(vars(value).values())
+            for cls in type(value).__mro__:
+                slots = getattr(cls, "__slots__", ())
+                for slot in (slots,) if isinstance(slots, str) else slots:
+                    if hasattr(value, slot):
+                        values.append(getattr(value, slot))
+    return size
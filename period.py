@@ -1,3 +1,6 @@
+from datetime import date
+
+from date_period import DatePeriod, Granularity
 from month import Month
 
 
@@ -7,6 +10,8 @@ class Period:
 
     OPTIONS = [month.localized_name for month in list(Month)]
 
+    __slots__ = ("first_month", "last_month")
+
     def __init__(self, first_month: Month, last_month: Month):
         self.first_month = first_month
         self.last_month = last_month
@@ -37,3 +42,13 @@ class Period:
         """
         count = self.last_month.value - self.first_month.value + 1
         return count if count >= 1 else count + 12
+
+    def to_date_period(self, year: int) -> DatePeriod:
+        """
+        Convert to the monthly period starting within the year.
+        The period ends within the next year if its last month precedes the first one.
+        """
+        last_year = year if self.last_month >= self.first_month else year + 1
+        first_date = date(year, self.first_month.value + 1, 1)
+        last_date = date(last_year, self.last_month.value + 1, 1)
+        return DatePeriod(first_date, last_date, Granularity.MONTH)
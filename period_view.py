@@ -22,18 +22,18 @@ class PeriodView:
         def save_score(widget_key: str):
             period.first_month = Month.parse(st.session_state[widget_key])
 
-        key = State.generate_key()
-        st.selectbox(Period.FIRST_MONTH_TEXT, Period.OPTIONS, index=period.first_month.value,
-                     key=key, on_change=lambda: save_score(key))
+        key = "period_first_month"
+        State.sync(key, Period.OPTIONS[period.first_month.value])
+        st.selectbox(Period.FIRST_MONTH_TEXT, Period.OPTIONS, key=key, on_change=lambda: save_score(key))
 
     @staticmethod
     def _create_last_month_input(period: Period):
         def save_score(widget_key: str):
             period.last_month = Month.parse(st.session_state[widget_key])
 
-        key = State.generate_key()
-        st.selectbox(Period.LAST_MONTH_TEXT, Period.OPTIONS, index=period.last_month.value,
-                     key=key, on_change=lambda: save_score(key))
+        key = "period_last_month"
+        State.sync(key, Period.OPTIONS[period.last_month.value])
+        st.selectbox(Period.LAST_MONTH_TEXT, Period.OPTIONS, key=key, on_change=lambda: save_score(key))
 
     @staticmethod
     def _validate(period: Period) -> Problems:
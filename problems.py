@@ -9,6 +9,10 @@ class Problems:
     def add_error(self, error: str):
         self._errors.append(error)
 
+    def extend(self, other: "Problems"):
+        self._warnings.extend(other._warnings)
+        self._errors.extend(other._errors)
+
     @property
     def warnings(self) -> list[str]:
         return self._warnings
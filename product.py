@@ -1,5 +1,18 @@
+from identity import next_id
+
+
 class Product:
     NAME_TEXT = "Название"
 
+    __slots__ = ("name", "_id")
+
     def __init__(self, name: str = ""):
         self.name = name
+        self._id = next_id()
+
+    @property
+    def id(self) -> int:
+        """
+        Stays the same while the product is renamed, unlike its index which changes when preceding ones are removed.
+        """
+        return self._id
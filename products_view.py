@@ -2,12 +2,19 @@ import streamlit as st
 
 from problems import Problems
 from product import Product
+from state import State
+from key import Key
 
 
 class ProductsView:
+    _SWEPT_KEY = Key("products.swept", default_value=None)  # identities of products
+
     @staticmethod
     def create(products: list[Product]) -> Problems:
         st.header("Товары")
+        product_ids = tuple(product.id for product in products)
+        if State.change(ProductsView._SWEPT_KEY, product_ids):
+            State.sweep(r"^product_[a-z]+_(\d+)$", lambda product_id: int(product_id) in product_ids)
         column_width_weights = [1, 50, 1]
         with st.container():
             columns = st.columns(column_width_weights)
@@ -19,13 +26,18 @@ class ProductsView:
                 with columns[0]:
                     st.text(f"{index + 1}.")
                 with columns[1]:
-                    product.name = st.text_input(Product.NAME_TEXT, key=f"product_name_{index}",
-                                                 value=product.name, label_visibility="collapsed").strip()
+                    name_key = f"product_name_{product.id}"
+
+                    def save_name(p: Product = product, widget_key: str = name_key):
+                        p.name = st.session_state[widget_key].strip()
+
+                    State.sync(name_key, product.name)
+                    st.text_input(Product.NAME_TEXT, key=name_key, label_visibility="collapsed", on_change=save_name)
                 with columns[-1]:
                     def remove_product(i: int = index):
                         products.pop(i)
 
-                    st.button(":x:", key=f"product_remove_{index}", help="Удалить товар",
+                    st.button(":x:", key=f"product_remove_{product.id}", help="Удалить товар",
                               on_click=remove_product)
         st.button(":heavy_plus_sign:", key="product_add", help="Добавить товар",
                   on_click=lambda: products.append(Product()))
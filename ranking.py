@@ -0,0 +1,31 @@
+import numpy as np
+import math
+
+
+def rank(total_scores: np.ndarray, count: int) -> list[list[int]]:
+    """
+    Find indices of the highest total scores without sorting all of them.
+
+    :param count: minimal number of indices to be ranked
+    :return: groups of indices of close total scores (in terms of math.isclose), sorted by score descending.
+             Scores which are close to the lowest selected one are ranked as well,
+             so there might be more than `count` indices in total
+    """
+    count = min(count, len(total_scores))
+    if count == 0:
+        return []
+    top_indices = np.argpartition(-total_scores, count - 1)[:count]
+    threshold = total_scores[top_indices].min()
+    # Vectorized version of math.isclose() with its default relative tolerance
+    is_close = np.abs(total_scores - threshold) <= 1e-09 * np.maximum(np.abs(total_scores), abs(threshold))
+    candidate_indices = np.flatnonzero((total_scores > threshold) | is_close)
+    candidate_indices = candidate_indices[np.argsort(-total_scores[candidate_indices], kind="stable")]
+    groups = []
+    leader_score = None
+    for index in candidate_indices.tolist():
+        total_score = float(total_scores[index])
+        if leader_score is None or not math.isclose(total_score, leader_score):
+            groups.append([])
+            leader_score = total_score
+        groups[-1].append(index)
+    return groups
@@ -1,27 +1,59 @@
 import streamlit as st
+import numpy as np
 
-from contractor import Contractor
+import sensitivity
+
+from contractor_table import ContractorTable
 from criterion import Criterion
+from state import State
+from key import Key
 
 
 class ResultView:
+    _SAMPLE_COUNT = 10_000
+    _CONCENTRATION = 100.0
+    _ROW_COUNT = 10
+    _PARETO_FRONT_KEY = Key("result.pareto_front", default_value=None)  # (version, indices of contractors)
+
     @staticmethod
-    def create(has_problems: bool, criteria: list[Criterion], contractors: list[Contractor]):
+    def create(has_problems: bool, criteria: list[Criterion], contractors: ContractorTable):
         st.header("Результат")
         if has_problems:
             st.info("Устраните выявленные проблемы, чтобы рассчитать наилучшего подрядчика", icon="ℹ")
             return
         if st.button("Рассчитать лучшего подрядчика", key="contractor_calculate_best"):
-            best_contractors = Contractor.find_best(criteria, contractors)
-            st.success(ResultView._get_best_contractor_text(best_contractors))
+            # Dominated contractors can't be the best under strictly positive weights, so only the front is ranked
+            is_positive = all(criterion.value > 0 for criterion in criteria)
+            candidates = ResultView._get_pareto_front(criteria, contractors) if is_positive else None
+            best_names = [contractors.names[index] for index in contractors.find_best(criteria, candidates)]
+            st.success(ResultView._get_best_contractor_text(best_names))
+        if st.button("Показать Парето-фронт", key="contractor_pareto_front",
+                     help="Подрядчики, которых не превосходит ни один другой подрядчик сразу по всем критериям"):
+            front = ResultView._get_pareto_front(criteria, contractors)
+            st.markdown(f"Недоминируемых подрядчиков: {len(front)} из {len(contractors)}")
+            st.dataframe(contractors.to_dataframe(criteria).iloc[front], hide_index=True)
+        if st.button("Оценить устойчивость выбора", key="contractor_sensitivity",
+                     help="Вероятность победы каждого подрядчика при небольших изменениях значимости критериев"):
+            weights = np.array([criterion.value for criterion in criteria], dtype=float)
+            # All the contractors are analyzed, since dominated ones can still take places other than the first one
+            samples = sensitivity.sample_dirichlet(weights, ResultView._SAMPLE_COUNT,
+                                                   concentration=ResultView._CONCENTRATION,
+                                                   rng=np.random.default_rng())
+            report = sensitivity.analyze(contractors.get_scores(criteria), samples)
+            st.dataframe(report.to_dataframe(contractors.names, ResultView._ROW_COUNT), hide_index=True)
+
+    @staticmethod
+    def _get_pareto_front(criteria: list[Criterion], contractors: ContractorTable) -> np.ndarray:
+        version = (contractors.version, tuple(criterion.name for criterion in criteria))
+        return State.memoize(ResultView._PARETO_FRONT_KEY, version, lambda: contractors.find_pareto_front(criteria))
 
     @staticmethod
-    def _get_best_contractor_text(best_contractors: list[Contractor]) -> str:
-        assert len(best_contractors) > 0
-        if len(best_contractors) == 1:
-            return f"Лучший подрядчик: {best_contractors[0].name}"
+    def _get_best_contractor_text(best_names: list[str]) -> str:
+        assert len(best_names) > 0
+        if len(best_names) == 1:
+            return f"Лучший подрядчик: {best_names[0]}"
         else:
             markdown = "Лучшие подрядчики:"
-            for contractor in best_contractors:
-                markdown += f"\n * {contractor.name}"
+            for name in best_names:
+                markdown += f"\n * {name}"
             return markdown
@@ -1,3 +1,7 @@
+import streamlit as st
+
+import section
+
 from second_result_view import SecondResultView
 from suppliers_view import SuppliersView
 from criteria_view import CriteriaView
@@ -5,6 +9,7 @@ from products_view import ProductsView
 from problems_view import ProblemsView
 from period_view import PeriodView
 from criterion import Criterion
+from problems import Problems
 from supplier import Supplier
 from product import Product
 from period import Period
@@ -42,13 +47,18 @@ class SecondApp:
     _CRITERIA_KEY = Key(f"{ID}.criteria", default_value=_INITIAL_CRITERIA)
     _PRODUCTS_KEY = Key(f"{ID}.products", default_value=_INITIAL_PRODUCTS)
     _PERIOD_KEY = Key(f"{ID}.period", default_value=_INITIAL_PERIOD)
+    _CRITERIA_HAS_ISSUES_KEY = Key(f"{ID}.criteria.has_issues", default_value=None)
+    _CRITERIA_VERSION_KEY = Key(f"{ID}.criteria.version", default_value=None)
 
     @staticmethod
     def create():
+        with section.app_run():
+            SecondApp._create_sections()
+
+    @staticmethod
+    def _create_sections():
         criteria = State.get(SecondApp._CRITERIA_KEY)
-        criteria_problems = CriteriaView.create(criteria, view_key=SecondApp.ID,
-                                                disable_name=True, disable_upload=True, disable_add_remove=True)
-        ProblemsView.create(criteria_problems)
+        criteria_problems = SecondApp._create_criteria(criteria)
         products = State.get(SecondApp._PRODUCTS_KEY)
         products_problems = ProductsView.create(products)
         ProblemsView.create(products_problems)
@@ -56,9 +66,22 @@ class SecondApp:
         period_problems = PeriodView.create(period)
         ProblemsView.create(period_problems)
         suppliers = State.get(SecondApp._SUPPLIERS_KEY)
-        suppliers_problems = SuppliersView.create(suppliers, products, period,
+        suppliers_problems = SuppliersView.create(suppliers, products, period, criteria,
                                                   has_errors=products_problems.has_errors or period_problems.has_errors)
         ProblemsView.create(suppliers_problems)
         has_problems = criteria_problems.has_issues or products_problems.has_issues \
             or period_problems.has_issues or suppliers_problems.has_issues
         SecondResultView.create(suppliers, products, criteria, period, has_problems)
+
+    @staticmethod
+    @st.fragment
+    def _create_criteria(criteria: list[Criterion]) -> Problems:
+        """
+        Reruns on its own whenever values of the criteria are edited.
+        """
+        problems = CriteriaView.create(criteria, view_key=SecondApp.ID,
+                                       disable_name=True, disable_upload=True, disable_add_remove=True)
+        ProblemsView.create(problems)
+        SecondResultView.invalidate(SecondApp._CRITERIA_VERSION_KEY, Criterion.get_version(criteria))
+        section.publish(SecondApp._CRITERIA_HAS_ISSUES_KEY, problems.has_issues)
+        return problems
@@ -1,16 +1,32 @@
+from typing import Hashable, Optional
 import math
 
 import streamlit as st
+import numpy as np
 
+import supplier_report
+import evaluators
+import sensitivity
+import section
+
+from supplier_view import SupplierView
 from criterion import Criterion
 from supplier import Supplier
 from product import Product
 from period import Period
-import evaluators
+from state import State
+from key import Key
 
 
 class SecondResultView:
+    _SAMPLE_COUNT = 10_000
+    _CONCENTRATION = 100.0
+    _ROW_COUNT = 10
+    _PARALLEL_SUPPLIER_COUNT = 1000  # Starting from it, worker processes pay off despite packing the suppliers
+    _SHOWN_KEY = Key("second.result.shown", default_value=False)
+
     @staticmethod
+    @st.fragment
     def create(
             suppliers: list[Supplier],
             products: list[Product],
@@ -18,24 +34,75 @@ class SecondResultView:
             period: Period,
             has_problems: bool
     ):
+        """
+        Reruns on its own, so calculations don't rerun sections with inputs.
+        Whenever the inputs or their problems change, the whole app is rerun by the corresponding sections.
+        """
+        State.reset(SecondResultView._SHOWN_KEY)
         st.header("Результат")
         if has_problems:
             st.info("Устраните выявленные проблемы, чтобы рассчитать наилучшего поставщика", icon="ℹ")
             return
         if st.button("Рассчитать лучшего поставщика", key="supplier_calculate_best"):
             total_scores = []
-            for supplier in suppliers:
-                scores = evaluators.evaluate(supplier, products, period)
-                total_score = SecondResultView._aggregate_scores(scores, criteria)
+            all_scores = []
+            for supplier, scores in zip(suppliers, SecondResultView._evaluate(suppliers, products, criteria, period)):
+                total_score = SecondResultView.aggregate_scores(scores, criteria)
                 st.markdown(SecondResultView._create_scores_markdown(supplier, scores, total_score))
                 total_scores.append(total_score)
+                all_scores.append(scores)
             min_score = min(total_scores)
             best_suppliers = [supplier for supplier, total_score in zip(suppliers, total_scores)
                               if math.isclose(total_score, min_score)]
             st.success(SecondResultView._create_best_suppliers_markdown(best_suppliers))
+            State.set(SecondResultView._SHOWN_KEY)
+            report = supplier_report.convert_to_excel(suppliers, products, period, criteria, all_scores)
+            st.download_button("Скачать отчет (Excel)", report, key="supplier_report_download_excel",
+                               mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                               file_name=supplier_report.EXCEL_FILE_NAME)
+        if st.button("Оценить устойчивость выбора", key="supplier_sensitivity",
+                     help="Вероятность победы каждого поставщика при небольших изменениях значимости критериев"):
+            scores = SecondResultView._evaluate(suppliers, products, criteria, period)
+            score_matrix = np.array([[supplier_scores.get(criterion.name, 0.0) for criterion in criteria]
+                                     for supplier_scores in scores], dtype=float)
+            weights = np.array([criterion.value for criterion in criteria], dtype=float)
+            samples = sensitivity.sample_dirichlet(weights, SecondResultView._SAMPLE_COUNT,
+                                                   concentration=SecondResultView._CONCENTRATION,
+                                                   rng=np.random.default_rng())
+            report = sensitivity.analyze(score_matrix, samples, maximize=False)
+            names = [supplier.name for supplier in suppliers]
+            st.dataframe(report.to_dataframe(names, SecondResultView._ROW_COUNT), hide_index=True)
+            State.set(SecondResultView._SHOWN_KEY)
+
+    @staticmethod
+    def invalidate(version_key: Key[Optional[Hashable]], version: Hashable):
+        """
+        Hide results which have been calculated for the inputs before they were changed by a section rerun on its own.
+        Reruns which haven't changed the inputs, e.g. preparing a file for downloading, keep the results.
+
+        :param version_key: where the version of the inputs of the section is kept between its runs
+        :param version: anything which changes whenever the inputs of the section do
+        """
+        if State.change(version_key, version) and State.reset(SecondResultView._SHOWN_KEY):
+            section.rerun_app()
+
+    @staticmethod
+    def _evaluate(
+            suppliers: list[Supplier],
+            products: list[Product],
+            criteria: list[Criterion],
+            period: Period
+    ) -> list[dict[str, float]]:
+        """
+        A few suppliers are scored with their running aggregates,
+        while lots of them, e.g. imported ones, are scored by worker processes.
+        """
+        if len(suppliers) >= SecondResultView._PARALLEL_SUPPLIER_COUNT:
+            return evaluators.evaluate_many(suppliers, products, period, criteria)
+        return [SupplierView.get_evaluator(supplier, products, period).evaluate(criteria) for supplier in suppliers]
 
     @staticmethod
-    def _aggregate_scores(scores: dict[str, float], criteria: list[Criterion]) -> float:
+    def aggregate_scores(scores: dict[str, float], criteria: list[Criterion]) -> float:
         result = 0.0
         for criterion in criteria:
             result += criterion.value * scores.get(criterion.name, 0.0)
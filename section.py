@@ -0,0 +1,46 @@
+from contextlib import contextmanager
+from typing import Hashable, Iterator
+
+import streamlit as st
+
+from state import State
+from key import Key
+
+
+# Sections of an app are Streamlit fragments, so a widget of a section reruns only the section itself.
+# Everything other sections depend on must be published, so that a change triggers a rerun of the whole app.
+
+_APP_RUN_KEY = Key("section.app.run", default_value=False)
+
+
+@contextmanager
+def app_run() -> Iterator[None]:
+    """
+    Mark a run of the whole app, as opposed to a rerun of a single section.
+    """
+    State.put(_APP_RUN_KEY, True)
+    try:
+        yield
+    finally:
+        State.put(_APP_RUN_KEY, False)
+
+
+def is_app_run() -> bool:
+    return State.get(_APP_RUN_KEY)
+
+
+def rerun_app():
+    """
+    Rerun the whole app unless it's already being run, so other sections catch up with the current one.
+    """
+    if not is_app_run():
+        st.rerun()
+
+
+def publish(key: Key, value: Hashable):
+    """
+    Keep a value other sections depend on, e.g. whether a section has problems.
+    If the value has changed while its section was being rerun on its own, the whole app is rerun.
+    """
+    if State.change(key, value):
+        rerun_app()
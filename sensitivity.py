@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+
+# Number of weight vectors evaluated within a single matrix product, bounds memory by (batch x alternative) floats
+_BATCH_SIZE = 1024
+
+# Dirichlet distribution doesn't accept zero parameters, so they are replaced with this one
+_MIN_CONCENTRATION = 1e-3
+
+
+class SensitivityReport:
+    NAME_TEXT = "Название"
+    WIN_PROBABILITY_TEXT = "Вероятность победы"
+    PLACE_TEXT = "место"
+
+    def __init__(self, win_probabilities: np.ndarray, rank_probabilities: np.ndarray):
+        self._win_probabilities = win_probabilities
+        self._rank_probabilities = rank_probabilities
+
+    @property
+    def win_probabilities(self) -> np.ndarray:
+        """
+        Share of weight samples in which each alternative is the best one, shape (alternative,).
+        """
+        return self._win_probabilities
+
+    @property
+    def rank_probabilities(self) -> np.ndarray:
+        """
+        Share of weight samples in which each alternative takes each of the leading places,
+        shape (alternative, place).
+        """
+        return self._rank_probabilities
+
+    def to_dataframe(self, names: list[str], row_count: int) -> pd.DataFrame:
+        """
+        Build a table of alternatives which are the most likely to take the leading places.
+        """
+        is_placed = self._rank_probabilities.sum(axis=1) > 0
+        indices = np.flatnonzero(is_placed)
+        indices = indices[np.argsort(-self._win_probabilities[indices], kind="stable")][:row_count]
+        data = {
+            SensitivityReport.NAME_TEXT: [names[index] for index in indices.tolist()],
+            SensitivityReport.WIN_PROBABILITY_TEXT: self._win_probabilities[indices],
+        }
+        for place in range(1, self._rank_probabilities.shape[1]):
+            data[f"{place + 1} {SensitivityReport.PLACE_TEXT}"] = self._rank_probabilities[indices, place]
+        return pd.DataFrame(data)
+
+
+def sample_dirichlet(weights: np.ndarray, count: int, concentration: float, rng: np.random.Generator) -> np.ndarray:
+    """
+    Sample weight vectors from the Dirichlet distribution centered at the normalized weights.
+    The higher the concentration, the closer samples are to the weights.
+
+    :return: matrix of shape (sample, criterion)
+    """
+    total = weights.sum()
+    normalized = weights / total if total > 0 else np.full_like(weights, 1.0 / len(weights))
+    alphas = np.maximum(normalized * concentration, _MIN_CONCENTRATION)
+    return rng.dirichlet(alphas, size=count) * (total if total > 0 else 1.0)
+
+
+def analyze(
+        scores: np.ndarray,
+        weight_samples: np.ndarray,
+        maximize: bool = True,
+        place_count: int = 3
+) -> SensitivityReport:
+    """
+    Re-rank alternatives for every sample of weights.
+    Samples are processed in batches, each of them is ranked with a single matrix product.
+    Ties are resolved in favor of the alternative with the lowest index.
+
+    :param scores: matrix of shape (alternative, criterion)
+    :param weight_samples: matrix of shape (sample, criterion)
+    :param maximize: whether the best alternative has the highest total score (otherwise the lowest one)
+    :param place_count: number of leading places to collect distribution for
+    """
+    alternative_count = scores.shape[0]
+    sample_count = weight_samples.shape[0]
+    place_count = min(place_count, alternative_count)
+    place_counts = np.zeros((alternative_count, place_count), dtype=np.int64)
+    if alternative_count == 0 or sample_count == 0 or place_count == 0:
+        return SensitivityReport(np.zeros(alternative_count), place_counts.astype(float))
+    scores = scores.astype(float)
+    sign = -1.0 if maximize else 1.0
+    for start in range(0, sample_count, _BATCH_SIZE):
+        keys = sign * (weight_samples[start:start + _BATCH_SIZE] @ scores.T)  # batch x alternative, lower is better
+        if place_count < alternative_count:
+            leaders = _find_leaders(keys, place_count)
+        else:
+            leaders = np.broadcast_to(np.arange(alternative_count), keys.shape)
+        leader_keys = np.take_along_axis(keys, leaders, axis=1)
+        leaders = np.take_along_axis(leaders, np.lexsort((leaders, leader_keys), axis=1), axis=1)
+        places = np.broadcast_to(np.arange(place_count), leaders.shape)
+        cells = leaders.ravel() * place_count + places.ravel()
+        place_counts += np.bincount(cells, minlength=alternative_count * place_count).reshape(place_counts.shape)
+    rank_probabilities = place_counts / sample_count
+    return SensitivityReport(rank_probabilities[:, 0].copy(), rank_probabilities)
+
+
+def _find_leaders(keys: np.ndarray, place_count: int) -> np.ndarray:
+    """
+    Find alternatives with the lowest keys without sorting all of them.
+    Unlike `np.argpartition`, ties at the last place are resolved in favor of the lowest indices.
+
+    :param keys: matrix of shape (sample, alternative)
+    :return: matrix of shape (sample, place), indices of each row are ascending rather than sorted by keys
+    """
+    thresholds = np.partition(keys, place_count - 1, axis=1)[:, place_count - 1:place_count]
+    is_below = keys < thresholds
+    is_tied = keys == thresholds
+    free_place_counts = place_count - is_below.sum(axis=1, keepdims=True)
+    is_leader = is_below | (is_tied & (np.cumsum(is_tied, axis=1) <= free_place_counts))
+    return np.nonzero(is_leader)[1].reshape(keys.shape[0], place_count)
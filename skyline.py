@@ -0,0 +1,33 @@
+import numpy as np
+
+
+def find_skyline(scores: np.ndarray) -> np.ndarray:
+    """
+    Find alternatives which are not dominated by any other one, i.e. the Pareto front.
+    An alternative dominates another one if it's not worse by any criterion
+    and is strictly better by at least one of them (higher scores are better).
+    Such alternatives are the only ones which can be the best under strictly positive weights.
+
+    Uses the sort-filter approach: duplicates are merged first and the rest are scanned
+    in the descending order of their score sums, so every alternative is only compared
+    with the current front rather than with all the other alternatives.
+
+    :param scores: matrix of shape (alternative, criterion)
+    :return: ascending indices of non-dominated alternatives
+    """
+    if scores.shape[0] == 0:
+        return np.empty(0, dtype=np.intp)
+    unique_scores, inverse = np.unique(scores, axis=0, return_inverse=True)
+    order = np.argsort(-unique_scores.sum(axis=1, dtype=float), kind="stable")
+    front = np.empty_like(unique_scores)
+    front_size = 0
+    is_on_front = np.zeros(len(unique_scores), dtype=bool)
+    for index in order.tolist():
+        row = unique_scores[index]
+        # Rows with higher sums were processed first, so distinct rows which are not worse dominate this one
+        if front_size > 0 and np.any(np.all(front[:front_size] >= row, axis=1)):
+            continue
+        front[front_size] = row
+        front_size += 1
+        is_on_front[index] = True
+    return np.flatnonzero(is_on_front[inverse.reshape(-1)])
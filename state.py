@@ -1,5 +1,6 @@
-from typing import TypeVar
+from typing import Callable, Hashable, Optional, TypeVar
 import streamlit as st
+import re
 
 from key import Key
 
@@ -8,12 +9,44 @@ TValue = TypeVar("TValue")
 
 
 class State:
-    _KEY_COUNTER_TEXT = "key_counter"
-
     @staticmethod
     def get(key: Key[TValue]) -> TValue:
         return State._get(key.name, key.default_value)
 
+    @staticmethod
+    def put(key: Key[TValue], value: TValue):
+        st.session_state[key.name] = value
+
+    @staticmethod
+    def change(key: Key[TValue], value: TValue) -> bool:
+        """
+        Put the value unless it's already there.
+
+        :return: True if the value differs from the previous one
+        """
+        if State.get(key) == value:
+            return False
+        State.put(key, value)
+        return True
+
+    @staticmethod
+    def memoize(
+            key: Key[Optional[tuple[Hashable, TValue]]],
+            version: Hashable,
+            calculate: Callable[[], TValue]
+    ) -> TValue:
+        """
+        Get the value which has been calculated for the same version during one of the previous reruns,
+        otherwise calculate it and keep it instead of the previous one.
+
+        :param version: anything which changes whenever the value does, e.g. versions of models it's derived from
+        """
+        entry = State.get(key)
+        if entry is None or entry[0] != version:
+            entry = (version, calculate())
+            State.put(key, entry)
+        return entry[1]
+
     @staticmethod
     def _get(value_name: str, default_value):
         if value_name not in st.session_state:
@@ -21,17 +54,30 @@ class State:
         return st.session_state[value_name]
 
     @staticmethod
-    def generate_key() -> str:
+    def sync(widget_key: str, value):
+        """
+        Make the widget show the value of the model, e.g. after the model has been changed by another widget.
+        Widget keys are derived from models rather than generated, so widgets keep their identities across reruns.
+        The widget must be created without a default value.
         """
-        Generate a string which can be used as a key for any widget.
-        Guaranteed to be unique, also changes every time
-        the application page is refreshed.
+        if st.session_state.get(widget_key) != value:
+            st.session_state[widget_key] = value
+
+    @staticmethod
+    def sweep(pattern: str, is_live: Callable[..., bool]):
+        """
+        Drop entries of the session state which belong to removed models,
+        e.g. memoized values or states of widgets, so long sessions don't accumulate them.
+        Every entry is scanned, so it's meant to be called only after the set of models has changed.
+
+        :param pattern: regular expression capturing identities of models in names of the entries
+        :param is_live: whether the models with the captured identities still exist, one argument per group
         """
-        if State._KEY_COUNTER_TEXT not in st.session_state:
-            st.session_state[State._KEY_COUNTER_TEXT] = 0
-        index = st.session_state[State._KEY_COUNTER_TEXT]
-        st.session_state[State._KEY_COUNTER_TEXT] += 1
-        return f"generated_key_{index}"
+        regex = re.compile(pattern)
+        for name in list(st.session_state.keys()):
+            match = regex.search(name)
+            if match is not None and not is_live(*match.groups()):
+                del st.session_state[name]
 
     @staticmethod
     def set(key: Key[bool]):
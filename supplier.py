@@ -1,18 +1,66 @@
-from typing import Optional
+from typing import Hashable, Optional
+import copy
 
-from supply import Supply
+from supply_ledger import SupplyLedger
+from version import next_version
+from identity import next_id
 from pair import Pair
 
 
 class Supplier:
     NAME_TEXT = "Название"
 
+    __slots__ = ("supplies", "prices", "name", "_prices_version", "_id")
+
+    _NO_PRICE = Pair()  # Shared by all the suppliers, so it must never be modified
+
     def __init__(
             self,
             name: str = "",
-            supplies: Optional[list[Supply]] = None,
+            supplies: Optional[SupplyLedger] = None,
             prices: Optional[dict[str, Pair]] = None
     ):
-        self.supplies = supplies if supplies is not None else []
+        self.supplies = supplies if supplies is not None else SupplyLedger()
         self.prices = prices if prices is not None else {}
         self.name = name
+        self._prices_version = next_version()
+        self._id = next_id()
+
+    def __deepcopy__(self, memo: dict) -> "Supplier":
+        # A copy is another model, so it gets versions of its own
+        supplier = Supplier(self.name, copy.deepcopy(self.supplies, memo), copy.deepcopy(self.prices, memo))
+        memo[id(self)] = supplier
+        return supplier
+
+    def __reduce__(self) -> tuple:
+        # Suppliers parsed by worker processes get identities and versions of this process
+        return Supplier, (self.name, self.supplies, self.prices)
+
+    @property
+    def id(self) -> int:
+        """
+        Stays the same while the supplier is edited, unlike its index which changes when preceding ones are removed.
+        """
+        return self._id
+
+    @property
+    def version(self) -> Hashable:
+        """
+        Changes whenever either supplies or prices do.
+        Edits of prices in place must be reported with `on_prices_changed` to be tracked.
+        """
+        return self.supplies.version, self._prices_version
+
+    @property
+    def prices_version(self) -> int:
+        return self._prices_version
+
+    def on_prices_changed(self):
+        self._prices_version = next_version()
+
+    def get_price(self, product_name: str) -> Pair:
+        """
+        Get the price of the product without modifying the supplier.
+        Missing prices are zeros. The result must not be modified.
+        """
+        return self.prices.get(product_name, Supplier._NO_PRICE)
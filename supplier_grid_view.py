@@ -0,0 +1,127 @@
+from typing import Hashable, Optional
+
+import streamlit as st
+import pandas as pd
+
+import collection_utils as cu
+
+from supply_ledger import EXPECTED, ACTUAL
+from evaluators import IncrementalEvaluator
+from supplier import Supplier
+from product import Product
+from period import Period
+from supply import Supply
+from state import State
+from pair import Pair
+from key import Key
+
+
+class SupplierGridView:
+    """
+    Edits supplies and prices of a supplier with a single table each instead of a widget per value.
+    A table is built from the model only when the latter has been changed by someone else,
+    while edits made with the table are applied back to the model as a diff.
+    So the table keeps its identity and rerun cost depends on the number of edits rather than the size of the table.
+    Since the table shows the edits on top of the original data, it's rebuilt once the edits are forgotten,
+    e.g. after the table hasn't been shown during a rerun.
+    """
+
+    @staticmethod
+    def create_supplies(
+            supplier: Supplier,
+            products: list[Product],
+            period: Period,
+            evaluator: IncrementalEvaluator,
+            view_key: str
+    ):
+        editor_key = f"supplies_editor_{view_key}"
+        grid_key = Key(f"{view_key}.supplies.grid", default_value=None)  # (version, dataframe)
+
+        def get_version() -> Hashable:
+            return supplier.supplies.version, tuple(product.name for product in products), period.first_month, \
+                period.last_month
+
+        def apply_edits():
+            columns = SupplierGridView._get_columns(products)
+            for row_index, values in st.session_state[editor_key]["edited_rows"].items():
+                for column, value in values.items():
+                    product, value_index = columns[column]
+                    quantity = supplier.supplies.cell(int(row_index), product.name)
+                    old_quantity = Pair(quantity.expected, quantity.actual)
+                    if SupplierGridView._set_value(quantity, value_index, value):
+                        evaluator.on_quantity_changed(product.name, old_quantity, quantity)
+            State.put(grid_key, (get_version(), State.get(grid_key)[1]))  # The table already shows the edits
+
+        grid = State.get(grid_key)
+        if grid is None or grid[0] != get_version() or editor_key not in st.session_state:
+            # The table must not share memory with the ledger, otherwise edits would change its identity
+            grid = (get_version(), Supply.to_dataframe(supplier.supplies, products, period).copy())
+            State.put(grid_key, grid)
+            st.session_state.pop(editor_key, None)  # Edits of the previous table don't apply to the new one
+        st.data_editor(grid[1], key=editor_key, hide_index=True, disabled=[Supply.MONTH_TEXT],
+                       column_config=SupplierGridView._get_column_config(products), on_change=apply_edits)
+
+    @staticmethod
+    def create_prices(supplier: Supplier, products: list[Product], evaluator: IncrementalEvaluator, view_key: str):
+        editor_key = f"prices_editor_{view_key}"
+        grid_key = Key(f"{view_key}.prices.grid", default_value=None)  # (version, dataframe)
+
+        def get_version() -> Hashable:
+            return supplier.prices_version, tuple(product.name for product in products)
+
+        def apply_edits():
+            columns = SupplierGridView._get_columns(products)
+            for values in st.session_state[editor_key]["edited_rows"].values():
+                for column, value in values.items():
+                    product, value_index = columns[column]
+                    price = cu.get_or_put(supplier.prices, key=product.name, default=Pair)
+                    old_price = Pair(price.expected, price.actual)
+                    if SupplierGridView._set_value(price, value_index, value):
+                        supplier.on_prices_changed()
+                        evaluator.on_price_changed(product.name, old_price, price)
+            State.put(grid_key, (get_version(), State.get(grid_key)[1]))  # The table already shows the edits
+
+        grid = State.get(grid_key)
+        if grid is None or grid[0] != get_version() or editor_key not in st.session_state:
+            values = []
+            for product in products:
+                price = supplier.get_price(product.name)
+                values.extend((price.expected, price.actual))
+            grid = (get_version(), pd.DataFrame([values], columns=Supply.get_columns(products)))
+            State.put(grid_key, grid)
+            st.session_state.pop(editor_key, None)  # Edits of the previous table don't apply to the new one
+        st.data_editor(grid[1], key=editor_key, hide_index=True,
+                       column_config=SupplierGridView._get_column_config(products), on_change=apply_edits)
+
+    @staticmethod
+    def _get_columns(products: list[Product]) -> dict[str, tuple[Product, int]]:
+        """
+        :return: column name -> (product, either EXPECTED or ACTUAL)
+        """
+        columns = {}
+        for product in products:
+            columns[Supply.get_expected_column(product)] = (product, EXPECTED)
+            columns[Supply.get_actual_column(product)] = (product, ACTUAL)
+        return columns
+
+    @staticmethod
+    def _get_column_config(products: list[Product]) -> dict[str, st.column_config.NumberColumn]:
+        return {column: st.column_config.NumberColumn(min_value=0.0) for column in Supply.get_columns(products)}
+
+    @staticmethod
+    def _set_value(pair: Pair, value_index: int, value: Optional[float]) -> bool:
+        """
+        Edits are accumulated by the table, so the ones which have already been applied are skipped.
+
+        :return: whether the pair has been changed
+        """
+        value = float(value) if value is not None else 0.0  # Cleared cells are zeros
+        if value_index == EXPECTED:
+            if pair.expected == value:
+                return False
+            pair.expected = value
+        else:
+            if pair.actual == value:
+                return False
+            pair.actual = value
+        return True
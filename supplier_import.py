@@ -0,0 +1,144 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from io import BytesIO
+import zipfile
+import os
+
+import openpyxl
+import numpy as np
+import pandas as pd
+
+import dataframe_utils as du
+
+from problems import Problems
+from supplier import Supplier
+from product import Product
+from supply import Supply
+from pair import Pair
+
+
+# Value of the month column which marks a row of prices rather than the one of supplies
+PRICE_TEXT = "Цена"
+
+# Name of a supplier -> either the supplier itself or an error message
+_ParsedSupplier = tuple[str, Optional[Supplier], Optional[str]]
+
+
+def read_suppliers(
+        file: BytesIO,
+        products: list[Product],
+        max_workers: Optional[int] = None
+) -> tuple[list[Supplier], Problems]:
+    """
+    Load several suppliers at once from either a workbook with a sheet per supplier
+    or a zip archive with a CSV file per supplier.
+    Sheets and files are named after suppliers and have the same columns as supplies of a single supplier.
+    The row with `PRICE_TEXT` in the month column, if any, holds prices of the products.
+    Sheets are parsed by a pool of worker processes, each of them opens the file only once.
+
+    :param max_workers: number of worker processes, defaults to the number of CPUs
+    :return: suppliers which have been loaded successfully and errors of the rest of them
+    :raise RuntimeError: if the file can't be read at all
+    """
+    max_workers = max_workers if max_workers is not None else os.cpu_count() or 1
+    data = file.getvalue()
+    if file.name.endswith(".xlsx"):
+        parse = _parse_sheets
+        names = _get_sheet_names(data)
+    elif file.name.endswith(".zip"):
+        parse = _parse_csv_files
+        names = _get_csv_file_names(data)
+    else:
+        raise RuntimeError(f"Unsupported extension of file '{file.name}'")
+    if len(names) == 0:
+        raise RuntimeError("В файле нет ни одного поставщика")
+    if max_workers == 1 or len(names) < 2:
+        parsed_suppliers = parse(data, names, products)
+    else:
+        group_count = min(len(names), max_workers)
+        bounds = [len(names) * group_index // group_count for group_index in range(group_count + 1)]
+        with ProcessPoolExecutor(max_workers=group_count) as executor:
+            futures = [
+                executor.submit(parse, data, names[start:stop], products) for start, stop in zip(bounds, bounds[1:])
+            ]
+            parsed_suppliers = [parsed_supplier for future in futures for parsed_supplier in future.result()]
+    suppliers = []
+    problems = Problems()
+    for name, supplier, error in parsed_suppliers:
+        if supplier is not None:
+            suppliers.append(supplier)
+        else:
+            problems.add_error(f"Поставщик '{name}': {error}")
+    return suppliers, problems
+
+
+def _get_sheet_names(data: bytes) -> list[str]:
+    try:
+        workbook = openpyxl.load_workbook(BytesIO(data), read_only=True)
+    except (zipfile.BadZipFile, KeyError) as error:
+        raise RuntimeError(f"Не удалось прочитать файл: {error}")
+    try:
+        return workbook.sheetnames
+    finally:
+        workbook.close()
+
+
+def _get_csv_file_names(data: bytes) -> list[str]:
+    try:
+        with zipfile.ZipFile(BytesIO(data)) as archive:
+            # Archives made on macOS contain resource forks of the files as well, they are skipped
+            return [name for name in archive.namelist() if name.endswith(".csv") and not name.startswith("__MACOSX/")]
+    except zipfile.BadZipFile as error:
+        raise RuntimeError(f"Не удалось прочитать файл: {error}")
+
+
+def _parse_sheets(data: bytes, sheet_names: list[str], products: list[Product]) -> list[_ParsedSupplier]:
+    workbook = openpyxl.load_workbook(BytesIO(data), read_only=True, data_only=True)
+    try:
+        parsed_suppliers = []
+        for sheet_name in sheet_names:
+            rows = workbook[sheet_name].iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                parsed_suppliers.append((sheet_name, None, "Лист пуст"))
+                continue
+            dataframe = pd.DataFrame(list(rows), columns=list(header))
+            parsed_suppliers.append(_parse_supplier(sheet_name, dataframe, products))
+        return parsed_suppliers
+    finally:
+        workbook.close()
+
+
+def _parse_csv_files(data: bytes, file_names: list[str], products: list[Product]) -> list[_ParsedSupplier]:
+    parsed_suppliers = []
+    with zipfile.ZipFile(BytesIO(data)) as archive:
+        for file_name in file_names:
+            name = os.path.splitext(os.path.basename(file_name))[0]
+            try:
+                with archive.open(file_name) as file:
+                    dataframe = pd.read_csv(file)
+            except (pd.errors.EmptyDataError, pd.errors.ParserError) as error:
+                parsed_suppliers.append((name, None, f"Не удалось прочитать файл: {error}"))
+                continue
+            parsed_suppliers.append(_parse_supplier(name, dataframe, products))
+    return parsed_suppliers
+
+
+def _parse_supplier(name: str, dataframe: pd.DataFrame, products: list[Product]) -> _ParsedSupplier:
+    try:
+        columns = Supply.get_columns(products)
+        du.check_columns(dataframe, columns)
+        if Supply.MONTH_TEXT in dataframe.columns:
+            is_price = (dataframe[Supply.MONTH_TEXT] == PRICE_TEXT).to_numpy()
+        else:
+            is_price = np.zeros(len(dataframe), dtype=bool)
+        supplies = Supply.from_dataframe(dataframe[~is_price], products)
+        prices = {}
+        price_rows = du.to_floats(dataframe.loc[is_price, columns].fillna(0.0))  # Blank prices are missing
+        if len(price_rows) > 0:
+            values = price_rows[-1].tolist()
+            for index, product in enumerate(products):
+                prices[product.name] = Pair(values[2 * index], values[2 * index + 1])
+        return name, Supplier(name, supplies, prices), None
+    except RuntimeError as error:
+        return name, None, str(error)
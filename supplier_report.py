@@ -0,0 +1,69 @@
+from typing import Any, Iterator, Sequence
+
+import dataframe_utils as du
+
+from criterion import Criterion
+from supplier import Supplier
+from product import Product
+from period import Period
+from supply import Supply
+
+
+SUPPLIER_TEXT = "Поставщик"
+TOTAL_SCORE_TEXT = "Общий балл"
+SUPPLIES_SHEET_NAME = "Поставки"
+PRICES_SHEET_NAME = "Цены"
+SCORES_SHEET_NAME = "Баллы"
+EXCEL_FILE_NAME = "suppliers.xlsx"
+
+
+def convert_to_excel(
+        suppliers: list[Supplier],
+        products: list[Product],
+        period: Period,
+        criteria: list[Criterion],
+        scores: list[dict[str, float]]
+) -> bytes:
+    """
+    Write supplies, prices and scores of all the suppliers into a single workbook, a sheet per table.
+    Rows are generated while the workbook is being written,
+    so memory doesn't depend on the number of suppliers.
+
+    :param scores: [Criterion.name -> score] in the same order as the suppliers
+    """
+    return du.write_excel([
+        (SUPPLIES_SHEET_NAME, _iter_supply_rows(suppliers, products, period)),
+        (PRICES_SHEET_NAME, _iter_price_rows(suppliers, products)),
+        (SCORES_SHEET_NAME, _iter_score_rows(suppliers, criteria, scores)),
+    ])
+
+
+def _iter_supply_rows(suppliers: list[Supplier], products: list[Product], period: Period) -> Iterator[Sequence[Any]]:
+    yield [SUPPLIER_TEXT, Supply.MONTH_TEXT, *Supply.get_columns(products)]
+    month_names = [month.localized_name for month in period.months]
+    for supplier in suppliers:
+        quantities = supplier.supplies.get_quantities(products, period.length)
+        for month_name, row in zip(month_names, quantities.reshape(period.length, -1).tolist()):
+            yield [supplier.name, month_name, *row]
+
+
+def _iter_price_rows(suppliers: list[Supplier], products: list[Product]) -> Iterator[Sequence[Any]]:
+    yield [SUPPLIER_TEXT, *Supply.get_columns(products)]
+    for supplier in suppliers:
+        row = [supplier.name]
+        for product in products:
+            price = supplier.get_price(product.name)
+            row.extend((price.expected, price.actual))
+        yield row
+
+
+def _iter_score_rows(
+        suppliers: list[Supplier],
+        criteria: list[Criterion],
+        scores: list[dict[str, float]]
+) -> Iterator[Sequence[Any]]:
+    yield [SUPPLIER_TEXT, *[criterion.name for criterion in criteria], TOTAL_SCORE_TEXT]
+    for supplier, supplier_scores in zip(suppliers, scores):
+        row = [supplier_scores.get(criterion.name, 0.0) for criterion in criteria]
+        total_score = sum(criterion.value * score for criterion, score in zip(criteria, row))
+        yield [supplier.name, *row, total_score]
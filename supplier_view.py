@@ -1,9 +1,17 @@
+from io import BytesIO
 import streamlit as st
+import pandas as pd
+import numpy as np
 import math
 
 import collection_utils as cu
 import dataframe_utils as du
+import parse_cache
 
+from evaluators import IncrementalEvaluator
+from supply_ledger import SupplyLedger
+from supplier_grid_view import SupplierGridView
+from download_view import DownloadView
 from pair_view import PairView
 from problems import Problems
 from supplier import Supplier
@@ -16,19 +24,76 @@ from key import Key
 
 
 class SupplierView:
+    _EVALUATORS_KEY = Key("suppliers.evaluators", default_value=None)  # id(supplier) -> IncrementalEvaluator
+
     @staticmethod
-    def create(supplier: Supplier, products: list[Product], period: Period, view_key: str) -> Problems:
-        supplier.name = st.text_input(Supplier.NAME_TEXT, value=supplier.name, key=f"supplier_name_{view_key}").strip()
-        column_width_weights = [len(products)] + [20] * len(products)
+    def create(
+            supplier: Supplier,
+            products: list[Product],
+            period: Period,
+            view_key: str,
+            grid_mode: bool = False
+    ) -> Problems:
+        """
+        :param grid_mode: whether supplies and prices are edited with tables rather than a widget per value
+        """
+        problems = Problems()
+        name_key = f"supplier_name_{view_key}"
+
+        def save_name():
+            supplier.name = st.session_state[name_key].strip()
+
+        State.sync(name_key, supplier.name)
+        st.text_input(Supplier.NAME_TEXT, key=name_key, on_change=save_name)
         st.markdown("#### Поставки")
         supplies_file_changed_key = Key(f"{view_key}.supplies.file.changed", default_value=False)
-        supplies_file = st.file_uploader("Загрузить поставки", key=f"supplies_upload_{view_key}", type=["csv", "xlsx"],
+        supplies_file = st.file_uploader("Загрузить поставки", key=f"supplies_upload_{view_key}",
+                                         type=["csv", "xlsx", "parquet", "arrow"],
                                          on_change=lambda: State.set(supplies_file_changed_key))
         if State.reset(supplies_file_changed_key) and supplies_file is not None:
-            dataframe = du.parse_dataframe(supplies_file)
-            uploaded_supplies = Supply.from_dataframe(dataframe, products)
-            supplier.supplies.clear()
-            supplier.supplies.extend(uploaded_supplies)
+            try:
+                supplies = parse_cache.get_or_parse(supplies_file, ("supplies", *Supply.get_columns(products)),
+                                                    lambda: SupplierView._parse_supplies(supplies_file, products))
+                supplier.supplies.assign(supplies)
+                SupplierView._get_evaluators().pop(id(supplier), None)
+            except RuntimeError as error:
+                problems.add_error(str(error))
+        evaluator = SupplierView.get_evaluator(supplier, products, period)
+        supplier.supplies.align(products)
+        supplier.supplies.ensure_month_count(period.length)
+        if grid_mode:
+            SupplierGridView.create_supplies(supplier, products, period, evaluator, view_key)
+        else:
+            SupplierView._create_supply_inputs(supplier, products, period, evaluator, view_key)
+        # Supplies are always available for downloading since there's no validation for them at all
+        SupplierView._create_downloads(supplier, products, period, view_key)
+        st.markdown("#### Цены товаров")
+        if grid_mode:
+            SupplierGridView.create_prices(supplier, products, evaluator, view_key)
+        else:
+            SupplierView._create_price_inputs(supplier, products, evaluator, view_key)
+        problems.extend(SupplierView.validate(supplier, products, period, view_key))
+        return problems
+
+    @staticmethod
+    def validate(supplier: Supplier, products: list[Product], period: Period, view_key: str) -> Problems:
+        """
+        Validate the supplier without creating any widgets, e.g. when its view isn't shown.
+        The result is kept until the supplier changes.
+        """
+        validation_key = Key(f"{view_key}.validation", default_value=None)  # (version, problems)
+        version = (supplier.name, supplier.version, tuple(product.name for product in products), period.length)
+        return State.memoize(validation_key, version, lambda: SupplierView._validate(supplier, products, period))
+
+    @staticmethod
+    def _create_supply_inputs(
+            supplier: Supplier,
+            products: list[Product],
+            period: Period,
+            evaluator: IncrementalEvaluator,
+            view_key: str
+    ):
+        column_width_weights = [len(products)] + [20] * len(products)
         with st.container():
             columns = st.columns(column_width_weights)
             for product_index, product in enumerate(products):
@@ -45,27 +110,26 @@ class SupplierView:
                         st.text(Pair.EXPECTED_TEXT)
                     with inner_columns[1]:
                         st.text(Pair.ACTUAL_TEXT)
-        cu.extend(supplier.supplies, until_length=period.length, with_value=Supply)
-        for supply, month in zip(supplier.supplies, period.months):
+        for month_index, month in enumerate(period.months):
             with st.container():
                 columns = st.columns(column_width_weights)
                 with columns[0]:
                     st.text(month.localized_name)
                 for product_index, product in enumerate(products):
                     with columns[product_index + 1]:
-                        quantity = cu.get_or_put(supply.quantities, key=product.name, default=Pair)
-                        PairView.create(quantity)
-        # Supplies are always available for downloading since there's no validation for them at all
-        supplies_dataframe = Supply.to_dataframe(supplier.supplies, products, period)
-        supplies_as_excel = du.convert_to_excel(supplies_dataframe)
-        supplies_as_csv = du.convert_to_csv(supplies_dataframe)
-        st.download_button("Скачать поставки (Excel)", supplies_as_excel, key=f"supplies_download_excel_{view_key}",
-                           mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                           file_name=Supply.EXCEL_FILE_NAME)
-        st.download_button("Скачать поставки (CSV)", supplies_as_csv, key=f"supplies_download_csv_{view_key}",
-                           file_name=Supply.CSV_FILE_NAME, mime="text/csv")
-        column_width_weights = column_width_weights[1:]
-        st.markdown("#### Цены товаров")
+                        quantity = supplier.supplies.cell(month_index, product.name)
+                        PairView.create(quantity, key=f"quantity_{view_key}_{month_index}_{product.name}",
+                                        on_change=lambda old, new, name=product.name:
+                                        evaluator.on_quantity_changed(name, old, new))
+
+    @staticmethod
+    def _create_price_inputs(
+            supplier: Supplier,
+            products: list[Product],
+            evaluator: IncrementalEvaluator,
+            view_key: str
+    ):
+        column_width_weights = [20] * len(products)
         with st.container():
             columns = st.columns(column_width_weights)
             for product_index, product in enumerate(products):
@@ -85,17 +149,87 @@ class SupplierView:
             for product_index, product in enumerate(products):
                 with columns[product_index]:
                     price = cu.get_or_put(supplier.prices, key=product.name, default=Pair)
-                    PairView.create(price)
-        return SupplierView._validate(supplier, products, period)
+                    PairView.create(price, key=f"price_{view_key}_{product.name}",
+                                    on_change=lambda old, new, name=product.name:
+                                    SupplierView._on_price_changed(supplier, evaluator, name, old, new))
+
+    @staticmethod
+    def _on_price_changed(
+            supplier: Supplier,
+            evaluator: IncrementalEvaluator,
+            product_name: str,
+            old_price: Pair,
+            new_price: Pair
+    ):
+        supplier.on_prices_changed()
+        evaluator.on_price_changed(product_name, old_price, new_price)
+
+    @staticmethod
+    def _create_downloads(supplier: Supplier, products: list[Product], period: Period, view_key: str):
+        supplies = supplier.supplies
+        version = (supplies.version, tuple(product.name for product in products), period.first_month, period.last_month)
+
+        def build_dataframe() -> pd.DataFrame:
+            return Supply.to_dataframe(supplies, products, period)
+
+        DownloadView.create("Скачать поставки (Excel)", lambda: du.convert_to_excel(build_dataframe()), version,
+                            file_name=Supply.EXCEL_FILE_NAME, key=f"supplies_download_excel_{view_key}",
+                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+        DownloadView.create("Скачать поставки (CSV)", lambda: du.convert_to_csv(build_dataframe()), version,
+                            file_name=Supply.CSV_FILE_NAME, mime="text/csv", key=f"supplies_download_csv_{view_key}")
+        DownloadView.create("Скачать поставки (Parquet)", lambda: du.convert_to_parquet(build_dataframe()), version,
+                            file_name=Supply.PARQUET_FILE_NAME, mime="application/vnd.apache.parquet",
+                            key=f"supplies_download_parquet_{view_key}")
+        DownloadView.create("Скачать поставки (Arrow)", lambda: du.convert_to_arrow(build_dataframe()), version,
+                            file_name=Supply.ARROW_FILE_NAME, mime="application/vnd.apache.arrow.file",
+                            key=f"supplies_download_arrow_{view_key}")
+
+    @staticmethod
+    def _parse_supplies(supplies_file: BytesIO, products: list[Product]) -> SupplyLedger:
+        with du.show_progress("Загрузка поставок") as on_progress:
+            dataframes = du.read_chunks(supplies_file, on_progress=on_progress, columns=Supply.get_columns(products))
+            return Supply.from_dataframes(dataframes, products)
+
+    @staticmethod
+    def get_evaluator(supplier: Supplier, products: list[Product], period: Period) -> IncrementalEvaluator:
+        """
+        Get running aggregates of the supplier which are kept up to date by its widgets.
+        Aggregates are rebuilt from scratch only if products or period have changed.
+        """
+        evaluators = SupplierView._get_evaluators()
+        evaluator = evaluators.get(id(supplier))
+        if evaluator is None or not evaluator.is_tracking(supplier, products, period):
+            evaluator = IncrementalEvaluator(supplier, products, period)
+            evaluators[id(supplier)] = evaluator
+        return evaluator
+
+    @staticmethod
+    def retain_evaluators(suppliers: list[Supplier]):
+        """
+        Drop running aggregates of all the suppliers which have been removed.
+        """
+        evaluators = SupplierView._get_evaluators()
+        supplier_ids = {id(supplier) for supplier in suppliers}
+        for supplier_id in list(evaluators.keys()):
+            if supplier_id not in supplier_ids:
+                del evaluators[supplier_id]
+
+    @staticmethod
+    def _get_evaluators() -> dict[int, IncrementalEvaluator]:
+        evaluators = State.get(SupplierView._EVALUATORS_KEY)
+        if evaluators is None:
+            evaluators = {}
+            State.put(SupplierView._EVALUATORS_KEY, evaluators)
+        return evaluators
 
     @staticmethod
     def _validate(supplier: Supplier, products: list[Product], period: Period) -> Problems:
         problems = Problems()
         if supplier.name == "":
             problems.add_error("Не задано название поставщика")
-        SupplierView._validate_supplies(supplier, products, period, problems)
+        problems.extend(SupplierView._validate_supplies(supplier, products, period))
         for product in products:
-            price = cu.get_or_put(supplier.prices, key=product.name, default=Pair)
+            price = supplier.get_price(product.name)
             if math.isclose(price.expected, 0.0):
                 problems.add_warning(f"{product.name}: не задана цена по договору")
             if math.isclose(price.actual, 0.0):
@@ -103,12 +237,9 @@ class SupplierView:
         return problems
 
     @staticmethod
-    def _validate_supplies(supplier: Supplier, products: list[Product], period: Period, problems: Problems):
-        cu.extend(supplier.supplies, until_length=period.length, with_value=Supply)
-        for month_index in range(period.length):
-            supply = supplier.supplies[month_index]
-            for product in products:
-                quantity = cu.get_or_put(supply.quantities, key=product.name, default=Pair)
-                if math.isclose(quantity.expected, 0.0) or math.isclose(quantity.actual, 0.0):
-                    problems.add_warning(f"Заданы не все поставки")
-                    return
+    def _validate_supplies(supplier: Supplier, products: list[Product], period: Period) -> Problems:
+        problems = Problems()
+        quantities = supplier.supplies.get_quantities(products, period.length)
+        if np.any(~np.isfinite(quantities) | (quantities == 0.0)):
+            problems.add_warning(f"Заданы не все поставки")
+        return problems
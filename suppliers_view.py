@@ -1,23 +1,62 @@
 import streamlit as st
+import numpy as np
 
+import supplier_import
+import parse_cache
+import section
+
+from second_result_view import SecondResultView
 from supplier_view import SupplierView
+from paging_view import PagingView
 from problems_view import ProblemsView
 from problems import Problems
+from criterion import Criterion
 from supplier import Supplier
 from product import Product
 from period import Period
+from supply import Supply
+from state import State
+from key import Key
 
 
 class SuppliersView:
+    _SWEPT_KEY = Key("suppliers.swept", default_value=None)  # (identities of suppliers, names of products, months)
+
     @staticmethod
-    def create(suppliers: list[Supplier], products: list[Product], period: Period, has_errors: bool) -> Problems:
+    def create(
+            suppliers: list[Supplier],
+            products: list[Product],
+            period: Period,
+            criteria: list[Criterion],
+            has_errors: bool
+    ) -> Problems:
+        """
+        Only suppliers on the current page get widgets, the rest of them are validated without ones.
+
+        :param criteria: criteria used to sort suppliers by their total scores
+        """
         st.header("Поставщики")
         if has_errors:
             problems = Problems()
             problems.add_error("Невозможно задать поставщиков, пока не исправлены ошибки выше")
             return problems
-        has_issues = False
-        for supplier_index, supplier in enumerate(suppliers):
+        import_problems = SuppliersView._create_import(suppliers, products)
+        ProblemsView.create(import_problems)
+        SupplierView.retain_evaluators(suppliers)
+        if State.change(SuppliersView._SWEPT_KEY, (tuple(supplier.id for supplier in suppliers),
+                                                   tuple(product.name for product in products), period.length)):
+            SuppliersView._sweep(suppliers, products, period)
+        grid_mode = st.toggle("Редактировать таблицами", key="suppliers_grid_mode",
+                              help="Одна таблица поставок и одна таблица цен на каждого поставщика "
+                                   "вместо отдельного поля для каждого значения")
+        page_indices = PagingView.create(
+            [supplier.name for supplier in suppliers],
+            lambda: SuppliersView._calculate_total_scores(suppliers, products, period, criteria),
+            view_key="suppliers", higher_is_better=False)
+        has_issues = import_problems.has_issues
+        for supplier_index in page_indices:
+            supplier = suppliers[supplier_index]
+            view_key = SuppliersView._get_view_key(supplier)
             with st.container():
                 columns = st.columns([1, 7])
                 with columns[0]:
@@ -26,20 +65,121 @@ class SuppliersView:
                     def remove_supplier(i: int = supplier_index):
                         suppliers.pop(i)
 
-                    st.button(":x:", key=f"supplier_remove_{supplier_index}", help="Удалить поставщика",
+                    st.button(":x:", key=f"supplier_remove_{view_key}", help="Удалить поставщика",
                               on_click=remove_supplier)
-            problems = SupplierView.create(supplier, products, period, view_key=f"supplier_{supplier_index}")
+            problems = SuppliersView._create_panel(supplier, products, period, view_key, grid_mode)
             has_issues = has_issues or problems.has_issues
-            ProblemsView.create(problems)
         st.button(":heavy_plus_sign:", key="supplier_add", help="Добавить поставщика",
                   on_click=lambda: suppliers.append(Supplier()))
-        return SuppliersView._validate(suppliers, has_issues)
+        hidden_names = SuppliersView._validate_hidden(suppliers, products, period, set(page_indices))
+        return SuppliersView._validate(suppliers, has_issues, hidden_names)
+
+    @staticmethod
+    @st.fragment
+    def _create_panel(
+            supplier: Supplier,
+            products: list[Product],
+            period: Period,
+            view_key: str,
+            grid_mode: bool
+    ) -> Problems:
+        """
+        Reruns on its own whenever supplies or prices of the supplier are edited.
+        Problems are aggregated by the suppliers view only during runs of the whole app,
+        so a change of their presence is published to trigger one.
+        """
+        problems = SupplierView.create(supplier, products, period, view_key=view_key, grid_mode=grid_mode)
+        ProblemsView.create(problems)
+        SecondResultView.invalidate(Key(f"{view_key}.panel.version", default_value=None),
+                                    (supplier.name, supplier.version))
+        section.publish(Key(f"{view_key}.has_issues", default_value=None), problems.has_issues)
+        return problems
+
+    @staticmethod
+    def _create_import(suppliers: list[Supplier], products: list[Product]) -> Problems:
+        problems = Problems()
+        suppliers_file_changed_key = Key("suppliers.file.changed", default_value=False)
+        suppliers_file = st.file_uploader("Загрузить всех поставщиков", key="suppliers_upload", type=["xlsx", "zip"],
+                                          help="Книга Excel с листом на каждого поставщика или архив с CSV-файлом "
+                                               "на каждого поставщика. Лист или файл называется по имени поставщика, "
+                                               f"а строка «{supplier_import.PRICE_TEXT}» в столбце "
+                                               f"«{Supply.MONTH_TEXT}» содержит цены товаров",
+                                          on_change=lambda: State.set(suppliers_file_changed_key))
+        if State.reset(suppliers_file_changed_key) and suppliers_file is not None:
+            try:
+                uploaded_suppliers, problems = parse_cache.get_or_parse(
+                    suppliers_file, ("suppliers", *Supply.get_columns(products)),
+                    lambda: supplier_import.read_suppliers(suppliers_file, products))
+                if len(uploaded_suppliers) > 0:
+                    suppliers.clear()
+                    suppliers.extend(uploaded_suppliers)
+            except RuntimeError as error:
+                problems.add_error(str(error))
+        return problems
+
+    @staticmethod
+    def _get_view_key(supplier: Supplier) -> str:
+        return f"supplier_{supplier.id}"
+
+    @staticmethod
+    def _sweep(suppliers: list[Supplier], products: list[Product], period: Period):
+        """
+        Drop the session state of the suppliers which have been removed,
+        as well as the one of the products and the months which have been removed from all the suppliers.
+        """
+        supplier_ids = {supplier.id for supplier in suppliers}
+        State.sweep(r"supplier_(\d+)", lambda supplier_id: int(supplier_id) in supplier_ids)
+        product_names = {product.name for product in products}
+        State.sweep(r"^quantity_supplier_\d+_(\d+)_(.*)_(?:expected|actual)$",
+                    lambda month_index, product_name:
+                        int(month_index) < period.length and product_name in product_names)
+        State.sweep(r"^price_supplier_\d+_(.*)_(?:expected|actual)$",
+                    lambda product_name: product_name in product_names)
+
+    @staticmethod
+    def _calculate_total_scores(
+            suppliers: list[Supplier],
+            products: list[Product],
+            period: Period,
+            criteria: list[Criterion]
+    ) -> np.ndarray:
+        """
+        :return: total score of each supplier, nan if it can't be evaluated yet
+        """
+        total_scores = np.full(len(suppliers), np.nan)
+        for supplier_index, supplier in enumerate(suppliers):
+            try:
+                scores = SupplierView.get_evaluator(supplier, products, period).evaluate(criteria)
+            except ZeroDivisionError:
+                continue  # Supplies or prices are still incomplete
+            total_scores[supplier_index] = SecondResultView.aggregate_scores(scores, criteria)
+        return total_scores
+
+    @staticmethod
+    def _validate_hidden(
+            suppliers: list[Supplier],
+            products: list[Product],
+            period: Period,
+            shown_indices: set[int]
+    ) -> list[str]:
+        """
+        :return: names of the suppliers which aren't shown on the current page and have issues
+        """
+        names = []
+        for supplier_index, supplier in enumerate(suppliers):
+            if supplier_index not in shown_indices:
+                view_key = SuppliersView._get_view_key(supplier)
+                if SupplierView.validate(supplier, products, period, view_key).has_issues:
+                    names.append(supplier.name if supplier.name != "" else f"№{supplier_index + 1}")
+        return names
 
     @staticmethod
-    def _validate(suppliers: list[Supplier], has_issues: bool) -> Problems:
+    def _validate(suppliers: list[Supplier], has_issues: bool, hidden_names: list[str]) -> Problems:
         problems = Problems()
         if len(suppliers) == 0:
             problems.add_error("Не задано ни одного поставщика")
-        if has_issues:
+        if has_issues or len(hidden_names) > 0:
             problems.add_error("При заполнении данных поставщиков допущены ошибки")
+        if len(hidden_names) > 0:
+            problems.add_error(f"Проблемы у поставщиков на других страницах: {', '.join(hidden_names)}")
         return problems
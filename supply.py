@@ -1,8 +1,10 @@
-from typing import Optional
+from typing import Iterable, Optional
+import numpy as np
 import pandas as pd
 
-import collection_utils as cu
+import dataframe_utils as du
 
+from supply_ledger import SupplyLedger
 from product import Product
 from period import Period
 from pair import Pair
@@ -12,37 +14,59 @@ class Supply:
     MONTH_TEXT = "Месяц"
     CSV_FILE_NAME = "supplies.csv"
     EXCEL_FILE_NAME = "supplies.xlsx"
+    PARQUET_FILE_NAME = "supplies.parquet"
+    ARROW_FILE_NAME = "supplies.arrow"
+
+    __slots__ = ("quantities",)
 
     def __init__(self, quantities: Optional[dict[str, Pair]] = None):
         self.quantities = quantities if quantities is not None else {}
 
     @staticmethod
-    def to_dataframe(supplies: list["Supply"], products: list[Product], period: Period) -> pd.DataFrame:
-        cu.extend(supplies, until_length=period.length, with_value=Supply)
-        quantities = {}
-        for product in products:
-            quantities[f"{product.name} {Pair.EXPECTED_MNEMONIC}"] = []
-            quantities[f"{product.name} {Pair.ACTUAL_MNEMONIC}"] = []
-        for supply in supplies:
-            for product in products:
-                quantity = cu.get_or_put(supply.quantities, key=product.name, default=Pair)
-                quantities[f"{product.name} {Pair.EXPECTED_MNEMONIC}"].append(quantity.expected)
-                quantities[f"{product.name} {Pair.ACTUAL_MNEMONIC}"].append(quantity.actual)
+    def to_dataframe(supplies: SupplyLedger, products: list[Product], period: Period) -> pd.DataFrame:
+        """
+        Build a dataframe with expected and actual quantities of every product in adjacent columns.
+        Quantities are not copied if the ledger is aligned with the products and covers exactly the period.
+        """
+        quantities = supplies.get_quantities(products, period.length)
+        quantities = quantities.reshape(period.length, 2 * len(products))
+        dataframe = pd.DataFrame(quantities, columns=Supply.get_columns(products), copy=False)
         month_names = [month.localized_name for month in period.months]
-        data = {Supply.MONTH_TEXT: month_names, **quantities}
-        return pd.DataFrame(data)
+        dataframe.insert(0, Supply.MONTH_TEXT, month_names)
+        return dataframe
+
+    @staticmethod
+    def from_dataframe(dataframe: pd.DataFrame, products: list[Product]) -> SupplyLedger:
+        return Supply.from_dataframes([dataframe], products)
 
     @staticmethod
-    def from_dataframe(dataframe: pd.DataFrame, products: list[Product]) -> list["Supply"]:
-        return [Supply._from_row(row, products) for _, row in dataframe.iterrows()]
+    def from_dataframes(dataframes: Iterable[pd.DataFrame], products: list[Product]) -> SupplyLedger:
+        """
+        Load supplies from consecutive chunks of rows.
+        Each chunk is converted into an array of quantities right away, so it can be released before the next one.
+        Blank cells are treated as zeros, just like missing months and products.
+        """
+        columns = Supply.get_columns(products)
+        chunks = [np.zeros((0, len(products), 2))]
+        for dataframe in dataframes:
+            du.check_columns(dataframe, columns)
+            quantities = du.to_floats(dataframe[columns].fillna(0.0))
+            chunks.append(quantities.reshape(len(dataframe), len(products), 2))
+        quantities = chunks[-1] if len(chunks) == 2 else np.concatenate(chunks)
+        return SupplyLedger([product.name for product in products], quantities)
 
     @staticmethod
-    def _from_row(row: pd.Series, products: list[Product]) -> "Supply":
-        quantities = {}
+    def get_columns(products: list[Product]) -> list[str]:
+        columns = []
         for product in products:
-            expected_key = f"{product.name} {Pair.EXPECTED_MNEMONIC}"
-            actual_key = f"{product.name} {Pair.ACTUAL_MNEMONIC}"
-            expected = float(row.get(expected_key, 0.0))
-            actual = float(row.get(actual_key, 0.0))
-            quantities[product.name] = Pair(expected, actual)
-        return Supply(quantities)
+            columns.append(Supply.get_expected_column(product))
+            columns.append(Supply.get_actual_column(product))
+        return columns
+
+    @staticmethod
+    def get_expected_column(product: Product) -> str:
+        return f"{product.name} {Pair.EXPECTED_MNEMONIC}"
+
+    @staticmethod
+    def get_actual_column(product: Product) -> str:
+        return f"{product.name} {Pair.ACTUAL_MNEMONIC}"
@@ -0,0 +1,59 @@
+from typing import Iterable, Iterator
+import numpy as np
+import pandas as pd
+
+import dataframe_utils as du
+
+from date_period import DatePeriod
+from product import Product
+from supply import Supply
+
+
+class SupplyHistory:
+    """
+    Date-indexed supplies of a single supplier which are too long to be kept in memory at once.
+    They are read as a stream of dataframes, e.g. the ones of `dataframe_utils.read_chunks`,
+    with a date column and the same quantity columns as `Supply` has.
+    Rows must be sorted by date; rows within the same step are summed up,
+    while rows outside the period are skipped.
+    """
+
+    DATE_TEXT = "Дата"
+
+    @staticmethod
+    def read_steps(
+            dataframes: Iterable[pd.DataFrame],
+            products: list[Product],
+            period: DatePeriod
+    ) -> Iterator[np.ndarray]:
+        """
+        Fold chunks of rows into chunks of complete steps.
+        Only the last step of a chunk is carried over to the next one,
+        so memory is bounded by the size of a single chunk.
+
+        :return: chunks of quantities of shape (step, product, {expected, actual}).
+                 Steps without supplies are not yielded at all
+        """
+        columns = Supply.get_columns(products)
+        carried_indices = np.zeros(0, dtype=np.int64)
+        carried_quantities = np.zeros((0, len(products), 2))
+        for dataframe in dataframes:
+            du.check_columns(dataframe, [SupplyHistory.DATE_TEXT, *columns])
+            dates = pd.to_datetime(dataframe[SupplyHistory.DATE_TEXT]).to_numpy(dtype="datetime64[D]")
+            indices = period.get_indices(dates)
+            quantities = du.to_floats(dataframe[columns]).reshape(len(dataframe), len(products), 2)
+            is_inside = (indices >= 0) & (indices < period.length)
+            indices = np.concatenate([carried_indices, indices[is_inside]])
+            quantities = np.concatenate([carried_quantities, quantities[is_inside]])
+            if len(indices) == 0:
+                continue
+            if np.any(np.diff(indices) < 0):
+                raise RuntimeError("Поставки должны быть упорядочены по дате")
+            step_starts = np.flatnonzero(np.diff(indices, prepend=-1))
+            steps = np.add.reduceat(quantities, step_starts, axis=0)
+            carried_indices = indices[step_starts[-1]:step_starts[-1] + 1]
+            carried_quantities = steps[-1:]
+            if len(steps) > 1:
+                yield steps[:-1]
+        if len(carried_indices) > 0:
+            yield carried_quantities
@@ -0,0 +1,186 @@
+from typing import Optional
+import numpy as np
+
+from version import next_version
+from product import Product
+from pair import Pair
+
+
+# Indices of the last axis of quantities
+EXPECTED = 0
+ACTUAL = 1
+
+
+class SupplyLedger:
+    """
+    Columnar storage of monthly supplies of a single supplier.
+    Quantities are kept in a single array of shape (month, product, {expected, actual}),
+    products are indexed by their names.
+    Missing months and products are treated as zeros.
+    """
+
+    __slots__ = ("_product_names", "_product_indices", "_quantities", "_version")
+
+    def __init__(self, product_names: Optional[list[str]] = None, quantities: Optional[np.ndarray] = None):
+        self._product_names = product_names if product_names is not None else []
+        self._product_indices = {name: index for index, name in enumerate(self._product_names)}
+        if quantities is None:
+            quantities = np.zeros((0, len(self._product_names), 2))
+        self._quantities = quantities
+        self._version = next_version()
+
+    def __deepcopy__(self, memo: dict) -> "SupplyLedger":
+        # A copy is another model, so it gets a version of its own
+        ledger = SupplyLedger(list(self._product_names), self._quantities.copy())
+        memo[id(self)] = ledger
+        return ledger
+
+    def __reduce__(self) -> tuple:
+        # Ledgers parsed by worker processes get versions of this process
+        return SupplyLedger, (self._product_names, self._quantities)
+
+    def __len__(self) -> int:
+        return self._quantities.shape[0]
+
+    @property
+    def product_names(self) -> list[str]:
+        return self._product_names
+
+    @property
+    def version(self) -> int:
+        """
+        Changes whenever either quantities or products do, including edits via cells.
+        """
+        return self._version
+
+    def get(self, month_index: int, product_name: str) -> Pair:
+        """
+        Get a copy of quantities without modifying the ledger.
+        """
+        product_index = self._product_indices.get(product_name)
+        if product_index is None or month_index >= len(self):
+            return Pair()
+        expected, actual = self._quantities[month_index, product_index].tolist()
+        return Pair(expected, actual)
+
+    def cell(self, month_index: int, product_name: str) -> Pair:
+        """
+        Get quantities which can be edited in place.
+        The ledger is extended if either the month or the product are missing.
+        """
+        self.ensure_month_count(month_index + 1)
+        product_index = self._product_indices.get(product_name)
+        if product_index is None:
+            product_index = self._add_product(product_name)
+        return _Cell(self, month_index, product_index)
+
+    def get_row(self, month_index: int) -> np.ndarray:
+        """
+        :return: view of quantities of all the products within the month, shape (product, {expected, actual})
+        """
+        return self._quantities[month_index]
+
+    def get_column(self, product_name: str) -> np.ndarray:
+        """
+        :return: view of quantities of the product within all the months, shape (month, {expected, actual})
+        """
+        product_index = self._product_indices.get(product_name)
+        if product_index is None:
+            return np.zeros((len(self), 2))
+        return self._quantities[:, product_index]
+
+    def get_quantities(self, products: list[Product], month_count: int) -> np.ndarray:
+        """
+        :return: quantities of the products within the first months, shape (month, product, {expected, actual}).
+                 It's a view of the ledger if it's aligned with the products and contains enough months
+        """
+        product_names = [product.name for product in products]
+        if self._product_names[:len(product_names)] == product_names and len(self) >= month_count:
+            return self._quantities[:month_count, :len(product_names)]
+        quantities = np.zeros((month_count, len(product_names), 2))
+        available_month_count = min(month_count, len(self))
+        for index, product_name in enumerate(product_names):
+            product_index = self._product_indices.get(product_name)
+            if product_index is not None:
+                quantities[:available_month_count, index] = self._quantities[:available_month_count, product_index]
+        return quantities
+
+    def ensure_month_count(self, month_count: int):
+        """
+        Extend the ledger with zero quantities until it contains the required number of months.
+        """
+        extra_month_count = month_count - len(self)
+        if extra_month_count > 0:
+            extra_quantities = np.zeros((extra_month_count, len(self._product_names), 2))
+            self._quantities = np.concatenate([self._quantities, extra_quantities])
+            self._version = next_version()
+
+    def align(self, products: list[Product]):
+        """
+        Reorder products, so the leading ones match the required ones.
+        Missing products are kept after them, so their quantities are not lost.
+        After that, quantities of the products can be accessed without copying.
+        """
+        product_names = [product.name for product in products]
+        if self._product_names[:len(product_names)] == product_names:
+            return
+        for product_name in product_names:
+            if product_name not in self._product_indices:
+                self._add_product(product_name)
+        active_names = set(product_names)
+        extra_names = [name for name in self._product_names if name not in active_names]
+        new_names = product_names + extra_names
+        self._quantities = self._quantities[:, [self._product_indices[name] for name in new_names]]
+        self._product_names = new_names
+        self._product_indices = {name: index for index, name in enumerate(new_names)}
+        self._version = next_version()
+
+    def assign(self, other: "SupplyLedger"):
+        """
+        Replace contents of this ledger with the ones of another ledger in-place.
+        """
+        self._product_names = other._product_names
+        self._product_indices = other._product_indices
+        self._quantities = other._quantities
+        self._version = next_version()
+
+    def _add_product(self, product_name: str) -> int:
+        product_index = len(self._product_names)
+        self._product_names = self._product_names + [product_name]
+        self._product_indices = {**self._product_indices, product_name: product_index}
+        extra_quantities = np.zeros((len(self), 1, 2))
+        self._quantities = np.concatenate([self._quantities, extra_quantities], axis=1)
+        self._version = next_version()
+        return product_index
+
+
+class _Cell(Pair):
+    """
+    Pair of quantities which are stored in a ledger.
+    """
+
+    __slots__ = ("_product_index", "_month_index", "_ledger")
+
+    def __init__(self, ledger: SupplyLedger, month_index: int, product_index: int):
+        # Values are stored in the ledger, so the base constructor is not called
+        self._product_index = product_index
+        self._month_index = month_index
+        self._ledger = ledger
+
+    @property
+    def expected(self) -> float:
+        return float(self._ledger._quantities[self._month_index, self._product_index, EXPECTED])
+
+    @expected.setter
+    def expected(self, value: float):
+        self._ledger._quantities[self._month_index, self._product_index, EXPECTED] = value
+        self._ledger._version = next_version()
+
+    @property
+    def actual(self) -> float:
+        return float(self._ledger._quantities[self._month_index, self._product_index, ACTUAL])
+
+    @actual.setter
+    def actual(self, value: float):
+        self._ledger._quantities[self._month_index, self._product_index, ACTUAL] = value
+        self._ledger._version = next_version()
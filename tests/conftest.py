@@ -0,0 +1,6 @@
+import os
+import sys
+
+
+# Modules of the app live in the root of the repository rather than in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
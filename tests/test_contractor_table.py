@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+
+from contractor_table import ContractorTable
+from contractor import Contractor
+from criterion import Criterion
+
+
+def test_find_best_on_pareto_front_matches_all_contractors():
+    rng = np.random.default_rng(0)
+    criteria = [Criterion("Цена", 0.5), Criterion("Качество", 0.3), Criterion("Удаленность", 0.2)]
+    scores = rng.integers(ContractorTable.MIN_SCORE, ContractorTable.MAX_SCORE + 1, size=(500, 3), dtype=np.uint8)
+    contractors = ContractorTable([criterion.name for criterion in criteria], [f"{i}" for i in range(500)], scores)
+    front = contractors.find_pareto_front(criteria)
+    assert len(front) < len(contractors)
+    assert contractors.find_best(criteria, front) == contractors.find_best(criteria)
+    assert contractors.rank(criteria, 1, front) == contractors.rank(criteria, 1)
+
+
+def test_from_dataframe_converts_names_to_strings():
+    criteria = [Criterion("Цена", 1.0)]
+    dataframe = pd.DataFrame({Contractor.NAME_TEXT: [12, np.nan, 7], "Цена": [1, 2, 3]})
+    contractors = ContractorTable.from_dataframe(criteria, dataframe)
+    assert contractors.names == ["12.0", "", "7.0"]
+    dataframe = pd.DataFrame({Contractor.NAME_TEXT: [12, 7], "Цена": [1, 2]})
+    assert ContractorTable.from_dataframe(criteria, dataframe).names == ["12", "7"]
@@ -0,0 +1,55 @@
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import dataframe_utils as du
+
+from product import Product
+from supply import Supply
+
+
+def _create_file(name: str, data: bytes) -> BytesIO:
+    file = BytesIO(data)
+    file.name = name
+    return file
+
+
+@pytest.mark.parametrize("data", [b"", b"not a workbook", b"PK\x03\x04garbage"])
+def test_read_chunks_rejects_broken_workbook(data: bytes):
+    with pytest.raises(RuntimeError):
+        list(du.read_chunks(_create_file("supplies.xlsx", data)))
+
+
+def test_read_chunks_rejects_workbook_without_header():
+    data = du.write_excel([(du.EXCEL_SHEET_NAME, [])])
+    with pytest.raises(RuntimeError, match="Файл пуст"):
+        list(du.read_chunks(_create_file("supplies.xlsx", data)))
+
+
+def test_read_chunks_rejects_empty_csv():
+    with pytest.raises(RuntimeError, match="Файл пуст"):
+        list(du.read_chunks(_create_file("supplies.csv", b"")))
+
+
+@pytest.mark.parametrize("chunk_size", [2, du.CHUNK_SIZE])
+def test_read_chunks_rejects_malformed_csv(chunk_size: int):
+    data = "А,Б\n1,2\n3,4\n5,6\n7,8,9\n".encode("utf-8")
+    with pytest.raises(RuntimeError, match="Не удалось прочитать файл"):
+        list(du.read_chunks(_create_file("supplies.csv", data), chunk_size=chunk_size))
+
+
+def test_to_floats_rejects_non_numeric_values():
+    dataframe = pd.DataFrame({"А": [1, None], "Б": ["2", "x"], "В": [3.0, 4.0]})
+    with pytest.raises(RuntimeError, match="Б$"):
+        du.to_floats(dataframe)
+    assert np.array_equal(du.to_floats(dataframe[["А", "В"]]), [[1.0, 3.0], [np.nan, 4.0]], equal_nan=True)
+
+
+def test_supplies_with_non_numeric_values_are_rejected():
+    products = [Product("А")]
+    data = "\n".join([",".join([Supply.MONTH_TEXT, *Supply.get_columns(products)]), "Январь,1,много"])
+    dataframes = du.read_chunks(_create_file("supplies.csv", data.encode("utf-8")))
+    with pytest.raises(RuntimeError, match="числами"):
+        Supply.from_dataframes(dataframes, products)
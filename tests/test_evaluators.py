@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+import evaluators
+
+from supply_ledger import SupplyLedger
+from criterion import Criterion
+from supplier import Supplier
+from product import Product
+from period import Period
+from month import Month
+from pair import Pair
+
+
+PRODUCTS = [Product("А"), Product("Б")]
+PERIOD = Period(Month.JANUARY, Month.JUNE)
+
+
+def _create_supplier(seed: int) -> Supplier:
+    rng = np.random.default_rng(seed)
+    quantities = rng.uniform(1.0, 10.0, size=(PERIOD.length, len(PRODUCTS), 2))
+    prices = {product.name: Pair(*rng.uniform(1.0, 5.0, size=2).tolist()) for product in PRODUCTS}
+    return Supplier(f"Поставщик {seed}", SupplyLedger([product.name for product in PRODUCTS], quantities), prices)
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_evaluate_many_matches_evaluate(max_workers: int):
+    suppliers = [_create_supplier(seed) for seed in range(5)]
+    results = evaluators.evaluate_many(suppliers, PRODUCTS, PERIOD, max_workers=max_workers)
+    assert len(results) == len(suppliers)
+    for supplier, scores in zip(suppliers, results):
+        expected_scores = evaluators.evaluate(supplier, PRODUCTS, PERIOD)
+        assert list(scores.keys()) == list(expected_scores.keys())
+        for criterion_name, score in scores.items():
+            assert score == pytest.approx(expected_scores[criterion_name])
+
+
+def test_evaluate_many_scores_only_active_criteria():
+    criteria = [Criterion("Цена", 0.5), Criterion("Неизвестный", 0.5)]
+    results = evaluators.evaluate_many([_create_supplier(0)], PRODUCTS, PERIOD, criteria, max_workers=1)
+    assert list(results[0].keys()) == ["Цена"]
+
+
+def test_evaluate_many_raises_like_evaluate():
+    supplier = Supplier("Пустой", SupplyLedger([product.name for product in PRODUCTS],
+                                               np.zeros((PERIOD.length, len(PRODUCTS), 2))))
+    with pytest.raises(ZeroDivisionError):
+        evaluators.evaluate(supplier, PRODUCTS, PERIOD)
+    with pytest.raises(ZeroDivisionError):
+        evaluators.evaluate_many([supplier], PRODUCTS, PERIOD, max_workers=1)
+
+
+def test_evaluate_many_scores_registered_criteria(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(evaluators, "_EVALUATORS", dict(evaluators._EVALUATORS))
+    monkeypatch.setattr(evaluators, "_ARRAY_CRITERION_NAMES", set(evaluators._ARRAY_CRITERION_NAMES))
+    evaluators.register_evaluator("Объем поставок", [evaluators.QUANTITY_AGGREGATES],
+                                  lambda aggregates: aggregates.expected_quantity)
+    evaluators.register_evaluator("Цена", [evaluators.PRICE_AGGREGATES], lambda aggregates: 1.0)
+    criteria = [Criterion("Объем поставок", 0.5), Criterion("Цена", 0.5)]
+    suppliers = [_create_supplier(seed) for seed in range(3)]
+    results = evaluators.evaluate_many(suppliers, PRODUCTS, PERIOD, criteria, max_workers=2)
+    assert results == [evaluators.evaluate(supplier, PRODUCTS, PERIOD, criteria) for supplier in suppliers]
+
+
+def test_evaluate_many_passes_nan_through_like_evaluate():
+    suppliers = [_create_supplier(seed) for seed in range(3)]
+    suppliers[1].supplies.cell(0, "А").expected = np.nan
+    suppliers[2].prices["Б"].actual = np.nan
+    expected_results = [evaluators.evaluate(supplier, PRODUCTS, PERIOD) for supplier in suppliers]
+    incremental_results = [evaluators.IncrementalEvaluator(supplier, PRODUCTS, PERIOD).evaluate(None)
+                           for supplier in suppliers]
+    results = evaluators.evaluate_many(suppliers, PRODUCTS, PERIOD, max_workers=1)
+    assert np.isnan(expected_results[1]["Объем"]) and np.isnan(expected_results[2]["Цена"])
+    for scores, incremental_scores, expected_scores in zip(results, incremental_results, expected_results):
+        assert scores == pytest.approx(expected_scores, nan_ok=True)
+        assert incremental_scores == pytest.approx(expected_scores, nan_ok=True)
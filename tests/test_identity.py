@@ -0,0 +1,33 @@
+import pickle
+import copy
+
+import numpy as np
+
+from contractor_table import ContractorTable
+from supplier import Supplier
+
+
+def test_contractor_ids_survive_removal():
+    contractors = ContractorTable(["Цена"], ["А", "Б", "В"], np.ones((3, 1), dtype=np.uint8))
+    ids = contractors.ids.tolist()
+    contractors.remove(0)
+    contractors.append("Г")
+    assert contractors.ids.tolist()[:2] == ids[1:]
+    assert len(set(contractors.ids.tolist())) == 3
+    assert contractors.ids[-1] not in ids
+
+
+def test_contractor_copy_gets_new_ids():
+    contractors = ContractorTable(["Цена"], ["А", "Б"], np.ones((2, 1), dtype=np.uint8))
+    copied = copy.deepcopy(contractors)
+    assert set(copied.ids.tolist()).isdisjoint(contractors.ids.tolist())
+    contractors.assign(copied)
+    assert contractors.ids.tolist() == copied.ids.tolist()
+
+
+def test_unpickled_supplier_gets_new_id_and_version():
+    supplier = Supplier("А")
+    unpickled = pickle.loads(pickle.dumps(supplier))
+    assert unpickled.name == supplier.name
+    assert unpickled.id != supplier.id
+    assert unpickled.version != supplier.version
@@ -0,0 +1,25 @@
+import numpy as np
+
+from paging_view import PagingView, SortOrder
+
+
+NAMES = ["Бета", 12, float("nan"), "", "альфа", 120]
+
+
+def _get_total_scores() -> np.ndarray:
+    return np.array([1.0, 2.0, np.nan, 0.0, 3.0, 2.0])
+
+
+def test_select_searches_non_string_and_blank_names():
+    assert PagingView._select(NAMES, _get_total_scores, "12", SortOrder.ORIGINAL, higher_is_better=True) == [1, 5]
+    assert PagingView._select(NAMES, _get_total_scores, "АЛЬ", SortOrder.ORIGINAL, higher_is_better=True) == [4]
+
+
+def test_select_sorts_non_string_and_blank_names():
+    indices = PagingView._select(NAMES, _get_total_scores, "", SortOrder.NAME, higher_is_better=True)
+    assert indices == [3, 1, 5, 2, 4, 0]
+
+
+def test_select_sorts_by_score_with_missing_scores_last():
+    indices = PagingView._select(NAMES, _get_total_scores, "", SortOrder.SCORE, higher_is_better=True)
+    assert indices == [4, 1, 5, 0, 3, 2]
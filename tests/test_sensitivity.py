@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+import sensitivity
+
+
+@pytest.mark.parametrize("maximize", [True, False])
+def test_analyze_resolves_ties_in_favor_of_lowest_index(maximize: bool):
+    scores = np.array([[0.0], [1.0], [1.0], [1.0], [1.0], [2.0]])
+    if maximize:
+        scores = 3.0 - scores
+    weight_samples = np.ones((4, 1))
+    report = sensitivity.analyze(scores, weight_samples, maximize=maximize, place_count=3)
+    assert report.rank_probabilities[:, 0].tolist() == [1, 0, 0, 0, 0, 0]
+    assert report.rank_probabilities[:, 1].tolist() == [0, 1, 0, 0, 0, 0]
+    assert report.rank_probabilities[:, 2].tolist() == [0, 0, 1, 0, 0, 0]
+
+
+def test_analyze_matches_full_sort():
+    rng = np.random.default_rng(0)
+    scores = rng.integers(0, 3, size=(40, 3)).astype(float)
+    weight_samples = rng.integers(1, 3, size=(100, 3)).astype(float)
+    report = sensitivity.analyze(scores, weight_samples, place_count=5)
+    keys = -(weight_samples @ scores.T)
+    order = np.lexsort((np.broadcast_to(np.arange(len(scores)), keys.shape), keys), axis=1)[:, :5]
+    expected = np.zeros((len(scores), 5))
+    for place in range(5):
+        expected[:, place] = np.bincount(order[:, place], minlength=len(scores)) / len(weight_samples)
+    assert np.array_equal(report.rank_probabilities, expected)
@@ -0,0 +1,59 @@
+from io import BytesIO
+import zipfile
+
+import numpy as np
+
+import supplier_import
+
+from supplier_view import SupplierView
+from supply_ledger import SupplyLedger
+from supplier import Supplier
+from product import Product
+from period import Period
+from supply import Supply
+from month import Month
+from pair import Pair
+
+
+PRODUCTS = [Product("А"), Product("Б")]
+
+
+def _create_archive(files: dict[str, str]) -> BytesIO:
+    file = BytesIO()
+    with zipfile.ZipFile(file, "w") as archive:
+        for file_name, text in files.items():
+            archive.writestr(file_name, text)
+    file.name = "suppliers.zip"
+    return file
+
+
+def test_read_suppliers_treats_blank_cells_as_zeros():
+    header = ",".join([Supply.MONTH_TEXT, *Supply.get_columns(PRODUCTS)])
+    text = "\n".join([header, "Январь,,2,3,4", "Февраль,1,2,3,4", f"{supplier_import.PRICE_TEXT},10,,20,20"])
+    suppliers, problems = supplier_import.read_suppliers(_create_archive({"Поставщик.csv": text}), PRODUCTS,
+                                                         max_workers=1)
+    assert not problems.has_issues
+    supplier = suppliers[0]
+    assert supplier.supplies.get(0, "А").expected == 0.0
+    assert supplier.get_price("А").actual == 0.0
+    validation = SupplierView._validate(supplier, PRODUCTS, Period(Month.JANUARY, Month.FEBRUARY))
+    assert validation.has_warnings and not validation.has_errors
+
+
+def test_validate_flags_non_finite_quantities():
+    quantities = np.ones((2, len(PRODUCTS), 2))
+    quantities[1, 0, 1] = np.nan
+    supplier = Supplier("Поставщик", SupplyLedger([product.name for product in PRODUCTS], quantities),
+                        {product.name: Pair(1.0, 1.0) for product in PRODUCTS})
+    period = Period(Month.JANUARY, Month.FEBRUARY)
+    assert SupplierView._validate(supplier, PRODUCTS, period).has_warnings
+    quantities[1, 0, 1] = 1.0
+    assert not SupplierView._validate(supplier, PRODUCTS, period).has_issues
+
+
+def test_read_suppliers_reports_non_numeric_cells():
+    header = ",".join([Supply.MONTH_TEXT, *Supply.get_columns(PRODUCTS)])
+    text = "\n".join([header, "Январь,x,2,3,4"])
+    suppliers, problems = supplier_import.read_suppliers(_create_archive({"Поставщик.csv": text}), PRODUCTS,
+                                                         max_workers=1)
+    assert suppliers == [] and problems.has_errors
@@ -0,0 +1,91 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import evaluators
+
+from supply_history import SupplyHistory
+from date_period import DatePeriod
+from supply_ledger import SupplyLedger
+from criterion import Criterion
+from supplier import Supplier
+from product import Product
+from period import Period
+from supply import Supply
+from month import Month
+from pair import Pair
+
+
+PRODUCTS = [Product("А"), Product("Б")]
+PERIOD = DatePeriod(date(2024, 1, 1), date(2024, 4, 30))
+
+
+def _create_dataframe(rows: list[tuple[str, float, float, float, float]]) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=[SupplyHistory.DATE_TEXT, *Supply.get_columns(PRODUCTS)])
+
+
+def _read_steps(dataframes: list[pd.DataFrame]) -> np.ndarray:
+    return np.concatenate(list(SupplyHistory.read_steps(dataframes, PRODUCTS, PERIOD)))
+
+
+def test_read_steps_carries_step_over_chunks():
+    dataframes = [
+        _create_dataframe([("2024-01-05", 1, 1, 2, 2), ("2024-02-01", 1, 2, 0, 0)]),
+        _create_dataframe([("2024-02-20", 3, 4, 1, 1)]),
+        _create_dataframe([("2024-02-28", 1, 1, 1, 1), ("2024-03-03", 5, 5, 5, 5)]),
+    ]
+    steps = _read_steps(dataframes)
+    assert steps.shape == (3, len(PRODUCTS), 2)
+    assert steps[:, 0, 0].tolist() == [1, 5, 5]
+    assert steps[1].tolist() == [[5, 7], [2, 2]]
+
+
+def test_read_steps_skips_rows_outside_period():
+    dataframes = [_create_dataframe([("2023-12-31", 9, 9, 9, 9), ("2024-01-01", 1, 1, 1, 1),
+                                     ("2024-05-01", 9, 9, 9, 9)])]
+    assert _read_steps(dataframes).tolist() == [[[1, 1], [1, 1]]]
+
+
+@pytest.mark.parametrize("dataframes", [
+    [_create_dataframe([("2024-02-01", 1, 1, 1, 1), ("2024-01-01", 1, 1, 1, 1)])],
+    [_create_dataframe([("2024-02-01", 1, 1, 1, 1)]), _create_dataframe([("2024-01-31", 1, 1, 1, 1)])],
+])
+def test_read_steps_rejects_out_of_order_rows(dataframes: list[pd.DataFrame]):
+    with pytest.raises(RuntimeError):
+        _read_steps(dataframes)
+
+
+def test_evaluate_history_treats_missing_steps_as_zeros():
+    dataframes = [_create_dataframe([("2024-01-10", 4, 3, 2, 2), ("2024-03-15", 6, 6, 1, 2)])]
+    assert len(_read_steps(dataframes)) == 2
+    prices = {"А": Pair(10, 11), "Б": Pair(20, 19)}
+    supplier = Supplier("Поставщик", prices=prices)
+    criteria = [Criterion("Объем"), Criterion("Цена"), Criterion("Ассортимент")]
+    scores = evaluators.evaluate_history(supplier, PRODUCTS, PERIOD,
+                                         SupplyHistory.read_steps(dataframes, PRODUCTS, PERIOD), criteria)
+    quantities = np.zeros((4, len(PRODUCTS), 2))
+    quantities[0] = [[4, 3], [2, 2]]
+    quantities[2] = [[6, 6], [1, 2]]
+    ledger = SupplyLedger([product.name for product in PRODUCTS], quantities)
+    expected_scores = evaluators.evaluate(Supplier("Поставщик", ledger, prices), PRODUCTS,
+                                          Period(Month.JANUARY, Month.APRIL), criteria)
+    assert scores == pytest.approx(expected_scores)
+
+
+@pytest.mark.parametrize("first_month, last_month", [(Month.JANUARY, Month.DECEMBER), (Month.OCTOBER, Month.MARCH)])
+def test_evaluate_history_over_date_period_matches_evaluate(first_month: Month, last_month: Month):
+    period = Period(first_month, last_month)
+    date_period = period.to_date_period(2023)
+    assert date_period.length == period.length
+    rng = np.random.default_rng(0)
+    quantities = rng.uniform(1.0, 10.0, size=(period.length, len(PRODUCTS), 2))
+    prices = {product.name: Pair(*rng.uniform(1.0, 5.0, size=2).tolist()) for product in PRODUCTS}
+    supplier = Supplier("Поставщик", SupplyLedger([product.name for product in PRODUCTS], quantities), prices)
+    rows = [(date_period.get_date(index).isoformat(), *quantities[index].ravel().tolist())
+            for index in range(period.length)]
+    dataframes = [_create_dataframe(rows[:5]), _create_dataframe(rows[5:])]
+    steps = SupplyHistory.read_steps(dataframes, PRODUCTS, date_period)
+    scores = evaluators.evaluate_history(supplier, PRODUCTS, date_period, steps)
+    assert scores == pytest.approx(evaluators.evaluate(supplier, PRODUCTS, period))
@@ -0,0 +1,12 @@
+import itertools
+
+
+_versions = itertools.count(1)
+
+
+def next_version() -> int:
+    """
+    Generate a version for a modified model.
+    Versions are unique among all the models, so a version identifies both the model and its state.
+    """
+    return next(_versions)